@@ -1,13 +1,15 @@
 # homepage.py
 import streamlit as st
 import sqlite3
-import hashlib
 import time
 from datetime import datetime
-import secrets
 import subprocess
 import sys
 import os
+from components.auth import (hash_password, verify_password, get_login_throttle, client_id, start_session,
+                             restore_session, end_session)
+from components.warmup import start_warmup, wait_for_warmup
+from engine.storage import Storage
 
 # Page configuration
 st.set_page_config(
@@ -48,20 +50,6 @@ def init_user_db():
     conn.commit()
     conn.close()
 
-def hash_password(password):
-    """Enhanced password hashing with salt"""
-    salt = secrets.token_hex(16)
-    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000).hex() + ':' + salt
-
-def verify_password(password, hashed_password):
-    """Verify password against hash"""
-    try:
-        password_hash, salt = hashed_password.split(':')
-        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000).hex() == password_hash
-    except:
-        # Fallback for old simple hash method
-        return hashlib.sha256(password.encode()).hexdigest() == hashed_password
-
 def register_user(username, email, password):
     """Enhanced user registration with validation"""
     # Input validation
@@ -93,29 +81,58 @@ def register_user(username, email, password):
         conn.close()
 
 def authenticate_user(username, password):
-    """Enhanced user authentication"""
+    """Enhanced user authentication, throttled per username.
+
+    Returns (True, user_data) or (False, message or None).
+    """
+    throttle = get_login_throttle()
+    client = client_id()
+    retry_after = throttle.retry_after(username, client)
+    if retry_after:
+        return False, f"Too many failed attempts. Try again in {retry_after} seconds."
+    if not throttle.acquire(username):
+        return False, "A sign-in for this account is already in progress."
+    
+    success = False
+    known = False
     conn = sqlite3.connect("users.db")
-    c = conn.cursor()
-    c.execute("SELECT id, password, email FROM users WHERE username = ? AND is_active = 1", (username,))
-    result = c.fetchone()
-    
-    if result:
-        user_id, stored_password, email = result
-        if verify_password(password, stored_password):
-            # Update last login
-            c.execute("UPDATE users SET last_login = datetime('now') WHERE id = ?", (user_id,))
-            conn.commit()
-            conn.close()
-            return True, {"id": user_id, "username": username, "email": email}
-    
-    conn.close()
-    return False, None
+    try:
+        c = conn.cursor()
+        c.execute("SELECT id, password, email FROM users WHERE username = ? AND is_active = 1", (username,))
+        result = c.fetchone()
+        
+        if result:
+            known = True
+            user_id, stored_password, email = result
+            if verify_password(password, stored_password):
+                # Update last login
+                c.execute("UPDATE users SET last_login = datetime('now') WHERE id = ?", (user_id,))
+                conn.commit()
+                success = True
+                return True, {"id": user_id, "username": username, "email": email}
+        
+        return False, None
+    finally:
+        conn.close()
+        throttle.release(username, client, success, known)
+
+def claim_legacy_data(user_id):
+    """Single-user installs: the history, watchlist and preferences from before
+    per-user storage go to the one account. Installs with more accounts pick
+    the owner with `python -m engine.storage --user-id <id>`."""
+    conn = sqlite3.connect("users.db")
+    try:
+        accounts = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    finally:
+        conn.close()
+    if accounts == 1:
+        storage = Storage(user_id=user_id)
+        storage.init()
+        storage.claim_legacy()
 
 def is_logged_in():
-    """Check if user is logged in"""
-    return ('logged_in' in st.session_state and 
-            st.session_state.logged_in and 
-            'user_data' in st.session_state)
+    """Check if user is logged in, or can be from a remember-me cookie"""
+    return restore_session()
 
 def redirect_to_main_app():
     """Redirect to main application (app.py)"""
@@ -132,21 +149,10 @@ def redirect_to_main_app():
     </div>
     """, unsafe_allow_html=True)
     
-    # Loading progress with status
+    # Real progress of the process-wide warm-up (catalog, similarity, caches)
     progress_bar = st.progress(0)
     status_text = st.empty()
-    
-    loading_steps = [
-        "🎬 Loading movie database...",
-        "🤖 Initializing AI recommendations...", 
-        "📊 Preparing your dashboard...",
-        "🚀 Launching Movie-Thruster..."
-    ]
-    
-    for i, step in enumerate(loading_steps):
-        status_text.markdown(f"<div style='text-align: center; font-size: 1.1rem; color: #374151;'>{step}</div>", unsafe_allow_html=True)
-        progress_bar.progress((i + 1) * 25)
-        time.sleep(0.8)
+    wait_for_warmup(progress_bar, status_text)
     
     # Final success message
     status_text.markdown("""
@@ -157,8 +163,6 @@ def redirect_to_main_app():
     </div>
     """, unsafe_allow_html=True)
     
-    time.sleep(1)
-    
     # Method 1: Using st.switch_page (Recommended for Streamlit 1.31+)
     try:
         if os.path.exists("pages/homepage.py"):
@@ -198,8 +202,7 @@ def show_manual_redirect():
     
     with col3:
         if st.button("🚪 Logout", use_container_width=True):
-            st.session_state.logged_in = False
-            st.session_state.user_data = None
+            end_session()
             st.success("Logged out successfully!")
             time.sleep(1)
             st.rerun()
@@ -223,8 +226,7 @@ def show_fallback_options():
     
     with col2:
         if st.button("🚪 Logout & Return", use_container_width=True):
-            st.session_state.logged_in = False
-            st.session_state.user_data = None
+            end_session()
             st.success("Logged out successfully!")
             time.sleep(1)
             st.rerun()
@@ -477,11 +479,12 @@ def show_login_form():
                 with st.spinner("Authenticating..."):
                     success, user_data = authenticate_user(username, password)
                     if success:
-                        st.session_state.logged_in = True
-                        st.session_state.user_data = user_data
+                        claim_legacy_data(user_data['id'])
+                        start_session(user_data, remember_me)
                         st.success("🎉 Login successful! Redirecting to Movie-Thruster...")
-                        time.sleep(1)
                         st.rerun()
+                    elif user_data:
+                        st.error(f"⏳ {user_data}")
                     else:
                         st.error("❌ Invalid credentials. Please check your username and password.")
 
@@ -557,6 +560,9 @@ def main():
     # Initialize database
     init_user_db()
     
+    # Start loading the app's data while the visitor is still signing in
+    start_warmup()
+    
     # Initialize session state
     if 'logged_in' not in st.session_state:
         st.session_state.logged_in = False
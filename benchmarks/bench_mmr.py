@@ -0,0 +1,72 @@
+# benchmarks/bench_mmr.py
+"""Latency of MMR diversity re-ranking on top of the similarity row.
+
+Times diverse_top_k() end to end (pool selection, pairwise gather, re-rank)
+on a catalog-sized cosine similarity matrix built from random vectors.
+
+    python -m benchmarks.bench_mmr --k 25 --pool 500
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from engine.diversity import diverse_top_k, mmr_rerank
+from engine.neighbors import top_k_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--movies', type=int, default=4806)
+    parser.add_argument('--k', type=int, default=25)
+    parser.add_argument('--pool', type=int, default=500)
+    parser.add_argument('--lam', type=float, default=0.7)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((args.movies, 64), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarity = vectors @ vectors.T
+
+    rows = rng.integers(0, args.movies, args.queries)
+    plain, rerank_only, end_to_end = [], [], []
+    for row in rows:
+        start = time.perf_counter()
+        pool, _ = top_k_rows(similarity[row:row + 1], row, args.pool)
+        plain.append((time.perf_counter() - start) * 1000)
+
+        pool = pool[0]
+        relevance = similarity[row, pool]
+        pairwise = similarity[np.ix_(pool, pool)]
+        start = time.perf_counter()
+        mmr_rerank(relevance, pairwise, args.k, args.lam)
+        rerank_only.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        diverse_top_k(similarity, row, args.k, args.lam, args.pool)
+        end_to_end.append((time.perf_counter() - start) * 1000)
+
+    def summary(timings):
+        timings = sorted(timings)
+        return f"p50={statistics.median(timings):.2f}ms p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms"
+
+    added = statistics.median(end_to_end) - statistics.median(plain)
+    print(f"movies={args.movies} pool={args.pool} k={args.k} lambda={args.lam}")
+    print(f"  pool selection only   {summary(plain)}")
+    print(f"  MMR re-rank only      {summary(rerank_only)}")
+    print(f"  diverse_top_k total   {summary(end_to_end)}")
+    print(f"  added by diversity    {added:.2f}ms (median)")
+
+    if added > args.budget_ms:
+        print(f"FAIL: MMR adds more than {args.budget_ms:.0f}ms")
+        return 1
+    print(f"OK: MMR adds under {args.budget_ms:.0f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
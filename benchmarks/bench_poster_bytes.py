@@ -0,0 +1,81 @@
+# benchmarks/bench_poster_bytes.py
+"""Image bytes per page, fixed w780 posters vs the size each view draws.
+
+Resolves poster paths for a sample of catalog movies through TMDB, then asks
+the image CDN for the size of every poster a page shows, once at w780 (what
+every view used to load) and once at the TMDB size picked for that view.
+Needs API_KEY and network access; sizes come from HEAD requests, nothing is
+downloaded.
+
+    python -m benchmarks.bench_poster_bytes --sample 40
+"""
+import argparse
+import asyncio
+import os
+import pickle
+import random
+import sys
+
+import aiohttp
+from dotenv import load_dotenv
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from components.utils import (CARD_POSTER_WIDTH, DETAIL_POSTER_WIDTH, GRID_POSTER_WIDTH,  # noqa: E402
+                              WATCHLIST_POSTER_WIDTH)
+from engine.metadata import POSTER_SIZES, MetadataClient, poster_size, poster_url  # noqa: E402
+
+# (view, posters on one page, drawn width)
+PAGES = [
+    ('browse grid', 20, GRID_POSTER_WIDTH),
+    ('recommendations', 10, CARD_POSTER_WIDTH),
+    ('watchlist', 10, WATCHLIST_POSTER_WIDTH),
+    ('movie details', 1, DETAIL_POSTER_WIDTH),
+]
+
+
+async def image_bytes(session, url):
+    async with session.head(url, allow_redirects=True) as response:
+        return int(response.headers.get('Content-Length', 0)) if response.status == 200 else 0
+
+
+async def run(args):
+    with open(args.movies, 'rb') as f:
+        movie_ids = list(pickle.load(f)['movie_id'].values())
+    sample = random.Random(args.seed).sample(movie_ids, args.sample)
+
+    metadata = MetadataClient(os.getenv('API_KEY'))
+    posters = [poster for poster in await metadata.posters(sample) if not poster.startswith('http')]
+    if not posters:
+        print("no poster paths resolved; is API_KEY set and TMDB reachable?")
+        return 1
+
+    async with aiohttp.ClientSession() as session:
+        sizes = {}
+        for width in POSTER_SIZES:
+            sizes[width] = await asyncio.gather(*[image_bytes(session, poster_url(poster, width)) for poster in posters])
+    mean = {width: sum(values) / len(values) for width, values in sizes.items()}
+
+    print(f"mean poster bytes over {len(posters)} movies: " +
+          "  ".join(f"w{width} {mean[width] / 1024:,.1f}KB" for width in POSTER_SIZES))
+    for view, count, width in PAGES:
+        before = mean[POSTER_SIZES[-1]] * count
+        after = mean[int(poster_size(width)[1:])] * count
+        print(f"  {view:16s} {count:3d} posters at {poster_size(width):>5s}: "
+              f"{before / 1024:8,.0f}KB -> {after / 1024:6,.0f}KB  ({before / max(after, 1):.1f}x less)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--movies', default='data/movie_dict.pkl')
+    parser.add_argument('--sample', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    load_dotenv()
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
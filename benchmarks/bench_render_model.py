@@ -0,0 +1,58 @@
+# benchmarks/bench_render_model.py
+"""Cost of a card's display fields per rerun, formatted every time vs cached.
+
+Builds ``--cards`` synthetic TMDB records and times what a rerun of a page of
+cards spends on dates, stars, badges and overviews: ``build_view`` is what
+every card did on every rerun before, ``movie_view`` is the cached lookup the
+cards make now. Widget emission is not included, it is the same either way.
+
+    python -m benchmarks.bench_render_model --cards 12 --reruns 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from components.render_model import build_view, movie_view  # noqa: E402
+
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'Fantasy', 'Horror', 'Romance', 'Science Fiction', 'Thriller']
+WORDS = "a young hero must travel across the galaxy to save the world from an ancient evil that threatens everything".split()
+
+
+def records(cards, seed=0):
+    rng = random.Random(seed)
+    return [(round(rng.uniform(4, 9), 1), rng.sample(GENRES, 3),
+             f"{rng.randrange(1950, 2024)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+             ' '.join(rng.choice(WORDS) for _ in range(60)) + '.')
+            for _ in range(cards)]
+
+
+def time_reruns(view, page, reruns):
+    started = time.perf_counter()
+    for _ in range(reruns):
+        for record in page:
+            view(*record)
+    return (time.perf_counter() - started) / reruns * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, default=12, help='cards on the page')
+    parser.add_argument('--reruns', type=int, default=2000)
+    args = parser.parse_args()
+
+    page = records(args.cards)
+    formatted = time_reruns(build_view, page, args.reruns)
+    cached = time_reruns(movie_view, page, args.reruns)
+    print(f"{args.cards} cards per rerun, mean over {args.reruns:,} reruns")
+    print(f"  formatted every rerun {formatted:8.1f}us")
+    print(f"  cached render model   {cached:8.1f}us  ({formatted / cached:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
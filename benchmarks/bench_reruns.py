@@ -0,0 +1,113 @@
+# benchmarks/bench_reruns.py
+"""Rerun cost per interaction, full-app rerun vs fragment-scoped rerun.
+
+Each rerun scope (sidebar, browse page, recent recommendations, one card
+button) is executed headless with ``streamlit.testing`` against the real
+catalog. The sessions get an injected engine whose poster cache is
+pre-seeded, so the numbers measure script cost, not TMDB.
+
+    python -m benchmarks.bench_reruns --runs 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from engine import POSTER_PLACEHOLDER, Catalog, MetadataClient, Recommender, SimilarityIndex, Storage  # noqa: E402
+
+
+def sidebar_scope():
+    from components.utils import init_session_state, init_db
+    from components.sidebar import make_sidebar
+    init_session_state()
+    init_db()
+    make_sidebar()
+
+
+def browse_scope():
+    from components.utils import init_session_state
+    from components.movie_browser import paging_movies
+    init_session_state()
+    paging_movies()
+
+
+def recent_scope():
+    from components.utils import init_session_state, show_recent_recommendations
+    init_session_state()
+    show_recent_recommendations()
+
+
+def card_scope():
+    from components.utils import init_session_state, watchlist_button
+    init_session_state()
+    watchlist_button(19995, "Avatar", key="watch_19995_0")
+
+
+def seeded_state(db_path):
+    catalog = Catalog.load(os.path.join(REPO_ROOT, 'data', 'movie_dict.pkl'), with_emotions=False)
+    metadata = MetadataClient(api_key=None)
+    for movie_id in catalog.movie_ids:
+        metadata.poster_cache.put(int(movie_id), POSTER_PLACEHOLDER)
+    storage = Storage(db_path)
+    storage.init()
+    return {
+        'engine': Recommender(catalog, SimilarityIndex(), metadata, storage),
+        'user_menu': 'Browse All Movies',
+    }
+
+
+def time_scope(script, state, runs):
+    timings = []
+    for _ in range(runs + 1):
+        app = AppTest.from_function(script, default_timeout=30)
+        for key, value in state.items():
+            app.session_state[key] = value
+        start = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if app.exception:
+            raise RuntimeError(f"{script.__name__} failed: {app.exception[0].value}")
+    # The first run pays for imports, drop it
+    return statistics.median(timings[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    state = seeded_state(os.path.join(tempfile.mkdtemp(prefix='rerun-bench-'), 'movies.db'))
+
+    scopes = {
+        'sidebar': time_scope(sidebar_scope, state, args.runs),
+        'browse page': time_scope(browse_scope, state, args.runs),
+        'recent recommendations': time_scope(recent_scope, state, args.runs),
+        'card button': time_scope(card_scope, state, args.runs),
+    }
+    full_rerun = scopes['sidebar'] + scopes['browse page'] + scopes['recent recommendations']
+
+    print("Scope cost (median ms per run):")
+    for name, ms in scopes.items():
+        print(f"  {name:<24} {ms:8.1f}")
+
+    interactions = [
+        ("➕ Watchlist on a browser card", 'card button'),
+        ("Next page in the browser", 'browse page'),
+        ("Refresh recent recommendations", 'recent recommendations'),
+    ]
+    print()
+    print(f"{'interaction':<34} {'full rerun':>11} {'fragment':>10} {'saved':>7}")
+    for label, scope in interactions:
+        fragment = scopes[scope]
+        print(f"{label:<34} {full_rerun:9.1f}ms {fragment:8.1f}ms {1 - fragment / full_rerun:6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_storage_users.py
+"""Per-user storage queries against a database shared by many synthetic users.
+
+Fills a temporary SQLite file with ``--users`` users, each with a random
+amount of recommendation history and watchlist, then times every per-user
+read the pages make (sidebar counts, recent history, dashboard history and
+its pages, watchlist and its pages) for a sample of users. The same reads are timed again with the
+per-user indexes dropped, which is what every query cost before storage
+was partitioned by user.
+
+    python -m benchmarks.bench_storage_users --users 20000 --history 60 --watchlist 15
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from engine.storage import Storage, now  # noqa: E402
+
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'Fantasy', 'Horror', 'Romance', 'Science Fiction', 'Thriller']
+
+QUERIES = [
+    ('count_recommendations', lambda storage: storage.count_recommendations()),
+    ('count_watchlist', lambda storage: storage.count_watchlist()),
+    ('fetch_recommendations(10)', lambda storage: storage.fetch_recommendations(10)),
+    ('fetch_all_recommendations', lambda storage: storage.fetch_all_recommendations()),
+    ('recommendations_page(10)', lambda storage: storage.recommendations_page(10)),
+    ('history_summary', lambda storage: storage.history_summary()),
+    ('get_watchlist', lambda storage: storage.get_watchlist()),
+    ('watchlist_page(10)', lambda storage: storage.watchlist_page(10)),
+    ('get_preferences', lambda storage: storage.get_preferences()),
+]
+
+
+def populate(storage, users, history, watchlist, seed=0):
+    rng = random.Random(seed)
+    date = now()
+    conn = storage.connect()
+    for user in range(users):
+        # Activity is skewed like real users: most have little, a few have a lot
+        n_history = min(int(rng.expovariate(1 / history)), history * 10)
+        n_watchlist = min(int(rng.expovariate(1 / watchlist)), watchlist * 10)
+        conn.executemany(
+            "INSERT INTO recommended_movies (movie_title, genres, rating, recommendation_date, user_id) VALUES (?, ?, ?, ?, ?)",
+            [(f"Movie {rng.randrange(5000)}", ', '.join(rng.sample(GENRES, 2)), round(rng.uniform(4, 9), 1), date, str(user))
+             for _ in range(n_history)])
+        conn.executemany(
+            "INSERT OR IGNORE INTO watchlist (user_id, movie_id, movie_title, added_date) VALUES (?, ?, ?, ?)",
+            [(str(user), movie_id, f"Movie {movie_id}", date) for movie_id in rng.sample(range(5000), n_watchlist)])
+        conn.execute("INSERT INTO user_preferences (user_id, preferred_genres, min_rating, created_date) VALUES (?, ?, ?, ?)",
+                     (str(user), ','.join(rng.sample(GENRES, 3)), 6.0, date))
+    conn.commit()
+    rows = conn.execute("SELECT COUNT(*) FROM recommended_movies").fetchone()[0]
+    conn.close()
+    return rows
+
+
+def time_queries(storage, users, sample, seed=1):
+    rng = random.Random(seed)
+    sampled = [storage.for_user(rng.randrange(users)) for _ in range(sample)]
+    results = {}
+    for name, query in QUERIES:
+        timings = []
+        for user_storage in sampled:
+            started = time.perf_counter()
+            query(user_storage)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--history', type=int, default=60, help='mean history rows per user')
+    parser.add_argument('--watchlist', type=int, default=15, help='mean watchlist size per user')
+    parser.add_argument('--sample', type=int, default=200, help='users timed per query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, 'movies.db'))
+        storage.init()
+        started = time.perf_counter()
+        rows = populate(storage, args.users, args.history, args.watchlist)
+        print(f"{args.users:,} users, {rows:,} history rows, built in {time.perf_counter() - started:.1f}s")
+
+        conn = storage.connect()
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT movie_title FROM recommended_movies WHERE user_id = ? ORDER BY id DESC LIMIT 10",
+                            ('1',)).fetchall()
+        print(f"history plan: {plan[-1][-1]}")
+        conn.close()
+
+        indexed = time_queries(storage, args.users, args.sample)
+
+        conn = storage.connect()
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchall():
+            conn.execute(f"DROP INDEX {name}")
+        conn.commit()
+        conn.close()
+        unindexed = time_queries(storage, args.users, args.sample)
+
+    print(f"{'median per call':28s} {'indexed':>10s} {'full scan':>10s}")
+    for name, _ in QUERIES:
+        print(f"{name:28s} {indexed[name]:8.3f}ms {unindexed[name]:8.2f}ms  ({unindexed[name] / indexed[name]:,.0f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
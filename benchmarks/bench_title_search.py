@@ -0,0 +1,98 @@
+# benchmarks/bench_title_search.py
+"""Latency benchmark for the fuzzy title index.
+
+Grows the TMDB catalog to ``--titles`` synthetic titles built from real title
+words, then times misspelled and half-typed queries against it.
+
+    python -m benchmarks.bench_title_search --titles 100000
+"""
+import argparse
+import pickle
+import random
+import statistics
+import sys
+import time
+
+from engine.title_search import TitleIndex
+
+
+def load_catalog_titles(path='data/movie_dict.pkl'):
+    with open(path, 'rb') as f:
+        movies_dict = pickle.load(f)
+    return list(movies_dict['title'].values())
+
+
+def synthetic_titles(seed_titles, count, rng):
+    words = sorted({word for title in seed_titles for word in title.split()})
+    titles = list(seed_titles)
+    while len(titles) < count:
+        titles.append(' '.join(rng.choice(words) for _ in range(rng.randint(1, 5))))
+    return titles[:count]
+
+
+def misspell(title, rng):
+    chars = list(title)
+    for _ in range(max(1, len(chars) // 10)):
+        i = rng.randrange(len(chars))
+        edit = rng.choice(('delete', 'swap', 'replace'))
+        if edit == 'delete' and len(chars) > 3:
+            del chars[i]
+        elif edit == 'swap' and i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        else:
+            chars[i] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    return ''.join(chars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--budget-ms', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_titles = load_catalog_titles()
+    titles = synthetic_titles(seed_titles, args.titles, rng)
+
+    start = time.perf_counter()
+    index = TitleIndex(titles)
+    build_seconds = time.perf_counter() - start
+
+    targets = [rng.randrange(len(seed_titles)) for _ in range(args.queries)]
+    queries = []
+    for position in targets:
+        title = seed_titles[position]
+        if rng.random() < 0.25:
+            # Half-typed prefix, as in the type-ahead pickers
+            queries.append(title[:max(2, len(title) // 2)])
+        else:
+            queries.append(misspell(title, rng))
+
+    latencies = []
+    hits = 0
+    for position, query in zip(targets, queries):
+        start = time.perf_counter()
+        results = index.search(query, limit=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+        # Duplicate titles exist in the catalog, so compare by text
+        if any(titles[found] == titles[position] for found, _ in results):
+            hits += 1
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"titles={len(titles)} build={build_seconds:.2f}s queries={len(queries)}")
+    print(f"latency p50={p50:.2f}ms p95={p95:.2f}ms max={latencies[-1]:.2f}ms")
+    print(f"recall@10={hits / len(queries):.3f}")
+
+    if p95 > args.budget_ms:
+        print(f"FAIL: p95 {p95:.2f}ms exceeds the {args.budget_ms:.0f}ms budget")
+        return 1
+    print(f"OK: p95 within the {args.budget_ms:.0f}ms budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
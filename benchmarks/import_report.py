@@ -0,0 +1,100 @@
+# benchmarks/import_report.py
+"""Cold-start import cost per entry script and per page, from ``-X importtime``.
+
+Each measurement runs in a fresh interpreter. The entry scripts (the login
+page ``app.py`` and the main app ``pages/homepage.py``) are measured by the
+modules they import at the top; each page of the main app is measured on
+top of the main app's imports, i.e. what opening that page adds the first
+time. Times are medians over ``--runs`` interpreters.
+
+    python -m benchmarks.import_report --runs 5 --top 5
+"""
+import argparse
+import ast
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+MARK = '--import-report--'
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+
+def entry_imports(path):
+    """Modules a script imports at its top level (function-level imports are skipped)."""
+    with open(os.path.join(REPO_ROOT, path)) as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def page_modules():
+    """The main app's page modules, read from its PAGES table without running it."""
+    with open(os.path.join(REPO_ROOT, 'pages', 'homepage.py')) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'PAGES' for t in node.targets):
+            return {name: module for name, (module, _) in ast.literal_eval(node.value).items()}
+    return {}
+
+
+def measure(modules, base=()):
+    """(total ms, {top-level module: cumulative ms}) for importing ``modules`` after ``base``."""
+    code = ''.join(f"import {module}\n" for module in base)
+    code += f"import sys; sys.stderr.write('{MARK}\\n')\n"
+    code += ''.join(f"import {module}\n" for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    stderr = result.stderr.split(MARK, 1)[1]
+    # Depth-0 lines are what the measured imports pulled in directly; nested
+    # ones are already included in their parent's cumulative time
+    top = {}
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top[match.group(4)] = int(match.group(2)) / 1000
+    return sum(top.values()), top
+
+
+def report(name, modules, base, runs, top_n):
+    totals, packages = [], defaultdict(list)
+    for _ in range(runs):
+        total, top = measure(modules, base)
+        totals.append(total)
+        for module, ms in top.items():
+            packages[module].append(ms)
+    heaviest = sorted(((statistics.median(values), module) for module, values in packages.items()), reverse=True)
+    print(f"{name:28s} {statistics.median(totals):8.0f}ms   " +
+          ", ".join(f"{module} {ms:.0f}" for ms, module in heaviest[:top_n]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=4, help='heaviest imports listed per row')
+    args = parser.parse_args()
+
+    print(f"{'entry / page':28s} {'import':>8s}   heaviest top-level imports (ms)")
+    report('login page (app.py)', entry_imports('app.py'), (), args.runs, args.top)
+    main_app = entry_imports(os.path.join('pages', 'homepage.py'))
+    report('main app (pages/homepage)', main_app, (), args.runs, args.top)
+    for page, module in page_modules().items():
+        report(f"  + {page}", [module], main_app, args.runs, args.top)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# benchmarks/load_api.py
+"""Load test for a local engine.api instance.
+
+Keeps ``--concurrency`` requests in flight for ``--duration`` seconds over a
+mix of endpoints and reports throughput, latency percentiles and status
+codes. With ``--revalidate`` every client sends back the ETag it last saw,
+so repeat requests measure the 304 path.
+
+    python -m engine.api --port 8080 &
+    python -m benchmarks.load_api --url http://127.0.0.1:8080 --concurrency 64 --duration 20
+"""
+import argparse
+import asyncio
+import pickle
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from urllib.parse import quote
+
+import aiohttp
+
+EMOTIONS = ['Happiness', 'Sadness', 'Romance', 'Inspiration', 'Comedy', 'Excitement', 'Suspense']
+
+
+def request_mix(titles, movie_ids, seed=0):
+    """Endless, weighted stream of request paths: mostly similar-movie lookups."""
+    rng = random.Random(seed)
+    while True:
+        roll = rng.random()
+        if roll < 0.6:
+            yield f"/similar?title={quote(rng.choice(titles))}&n={rng.choice([5, 10, 25])}"
+        elif roll < 0.75:
+            yield f"/emotion?emotion={rng.choice(EMOTIONS)}&genre=Drama"
+        elif roll < 0.9:
+            yield f"/movies/{rng.choice(movie_ids)}"
+        elif roll < 0.97:
+            yield "/watchlist/recommendations?n=10"
+        else:
+            yield "/metrics"
+
+
+async def client(session, base_url, paths, deadline, revalidate, latencies, statuses):
+    etags = {}
+    while time.perf_counter() < deadline:
+        path = next(paths)
+        headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+        start = time.perf_counter()
+        try:
+            async with session.get(base_url + path, headers=headers) as response:
+                await response.read()
+                statuses[response.status] += 1
+                if 'ETag' in response.headers:
+                    etags[path] = response.headers['ETag']
+        except aiohttp.ClientError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(args):
+    with open(args.movies, 'rb') as f:
+        movies = pickle.load(f)
+    # A small hot set of titles, like real traffic, so caches get a chance to work
+    titles = list(movies['title'].values())[:args.hot_titles]
+    movie_ids = list(movies['movie_id'].values())[:args.hot_titles]
+    paths = request_mix(titles, movie_ids)
+
+    latencies, statuses = [], Counter()
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    # The watchlist endpoints answer 401 without a signed-in session
+    headers = {'Authorization': f"Bearer {args.session}"} if args.session else {}
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*[
+            client(session, args.url, paths, deadline, args.revalidate, latencies, statuses)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"no successful requests: {dict(statuses)}")
+        return 1
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.1f}s at concurrency {args.concurrency}: "
+          f"{len(latencies) / elapsed:,.0f} req/s")
+    print(f"  latency p50 {statistics.median(latencies):.1f}ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms  max {latencies[-1]:.1f}ms")
+    print(f"  status  {dict(sorted(statuses.items(), key=str))}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--movies', default='data/movie_dict.pkl')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--hot-titles', type=int, default=200)
+    parser.add_argument('--session', help='id of a live login session, for the watchlist endpoints')
+    parser.add_argument('--revalidate', action='store_true', help='send If-None-Match with the last ETag per path')
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# components/auth.py
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from engine.sessions import SESSION_COOKIE, SessionStore
+
+PBKDF2_ITERATIONS = 100000
+# hashlib releases the GIL while hashing, so these threads really use cores;
+# keeping the pool small leaves the rest for rendering pages
+HASH_WORKERS = max(1, min(2, (os.cpu_count() or 1) // 2))
+# Failed attempts allowed per username within the window before it is locked
+MAX_FAILED_ATTEMPTS = 5
+ATTEMPT_WINDOW = 300
+# Usernames with recent failures kept in memory; the oldest go first
+MAX_TRACKED_LOGINS = 10000
+# Header a reverse proxy in front of the app overwrites with the peer address
+# (e.g. X-Real-Ip). Unset means no trusted proxy: clients can write any header
+TRUSTED_PROXY_HEADER = os.getenv('TRUSTED_PROXY_HEADER')
+
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="pbkdf2")
+
+
+def pbkdf2(password, salt):
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), PBKDF2_ITERATIONS).hex()
+
+
+# Every hash goes through the bounded pool; callers wait, other sessions keep rendering
+def hash_password(password):
+    salt = secrets.token_hex(16)
+    return _hash_pool.submit(pbkdf2, password, salt).result() + ':' + salt
+
+
+def verify_password(password, hashed_password):
+    if ':' not in hashed_password:
+        # Fallback for old simple hash method
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed_password)
+    password_hash, salt = hashed_password.split(':', 1)
+    return hmac.compare_digest(_hash_pool.submit(pbkdf2, password, salt).result(), password_hash)
+
+
+class LoginThrottle:
+    """Failed-attempt limit per username, shared by every session of the process.
+
+    After ``max_attempts`` failures within ``window`` seconds the username is
+    locked until the oldest of them expires. ``client`` is only part of the
+    key when it comes from a trusted proxy (see ``client_id``); then other
+    clients can still sign in to the account. Only failures against
+    existing accounts are recorded, and at most ``max_tracked`` keys are
+    kept, so guessing usernames cannot grow the table without bound. Only
+    one verification per username runs at a time, so a burst against one
+    account costs one core, not the whole hash pool.
+    """
+
+    def __init__(self, max_attempts=MAX_FAILED_ATTEMPTS, window=ATTEMPT_WINDOW, max_tracked=MAX_TRACKED_LOGINS):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_tracked = max_tracked
+        # username or (username, client) -> failure times, oldest key first
+        self._failures = OrderedDict()
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(username, client):
+        return username if client is None else (username, client)
+
+    def _expire(self, key, now):
+        failures = self._failures.get(key)
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if failures is not None and not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def _prune(self, now):
+        for key in [key for key, failures in self._failures.items() if failures[-1] <= now - self.window]:
+            del self._failures[key]
+        while len(self._failures) > self.max_tracked:
+            self._failures.popitem(last=False)
+
+    def retry_after(self, username, client=None):
+        """Seconds until ``username`` may be tried again, 0 if it may be tried now."""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._expire(self._key(username, client), now)
+            if failures and len(failures) >= self.max_attempts:
+                return max(1, int(failures[0] + self.window - now))
+            return 0
+
+    def acquire(self, username):
+        """Claim the username's verification slot; False if one is already running."""
+        with self._lock:
+            if username in self._in_flight:
+                return False
+            self._in_flight.add(username)
+            return True
+
+    def release(self, username, client, success, known=True):
+        """Free the slot; a failed attempt counts only if ``username`` is a real account."""
+        key = self._key(username, client)
+        with self._lock:
+            self._in_flight.discard(username)
+            if success:
+                self._failures.pop(key, None)
+            elif known:
+                now = time.monotonic()
+                self._failures.setdefault(key, deque()).append(now)
+                self._failures.move_to_end(key)
+                if len(self._failures) > self.max_tracked:
+                    self._prune(now)
+
+
+# Streamlit side: one throttle and session store per process, the session id in a cookie for remember-me
+
+@st.cache_resource
+def get_login_throttle():
+    return LoginThrottle()
+
+
+@st.cache_resource
+def get_session_store():
+    store = SessionStore()
+    store.init()
+    return store
+
+
+def client_id():
+    """Peer address set by the trusted proxy, for the login throttle; None without one.
+
+    Client-supplied headers are never used: a fresh value per request would
+    be a fresh throttle bucket. A proxy appends the peer it saw, so only the
+    last X-Forwarded-For entry is its own.
+    """
+    if not TRUSTED_PROXY_HEADER:
+        return None
+    address = st.context.headers.get(TRUSTED_PROXY_HEADER) or ''
+    return address.rsplit(',', 1)[-1].strip() or None
+
+
+def write_session_cookie(session_id, expires):
+    # Streamlit cannot set response cookies; a zero-height component sets it
+    # on the app's document. An empty id with a past expiry deletes it. The
+    # markup only depends on its arguments, so reruns do not re-run it.
+    import streamlit.components.v1 as components
+
+    expiry = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(expires))
+    components.html(f"""<script>
+    const secure = window.parent.location.protocol === 'https:' ? '; Secure' : '';
+    window.parent.document.cookie = '{SESSION_COOKIE}={session_id}; expires={expiry}; path=/; SameSite=Strict' + secure;
+    </script>""", height=0)
+
+
+def start_session(user_data, remember_me=False):
+    st.session_state.logged_in = True
+    st.session_state.user_data = user_data
+    st.session_state.remember_me = remember_me
+    if remember_me:
+        st.session_state.session_id, st.session_state.session_expires = get_session_store().create(user_data['id'])
+
+
+def restore_session():
+    """True if this session is logged in, restoring it from the remember-me cookie if needed.
+
+    A reload starts a new session with empty state; the session id in the
+    cookie is looked up server-side, so logged-out, expired and deactivated
+    sessions are refused.
+    """
+    state = st.session_state
+    # Tokens used to travel in the URL, drop any still in a bookmark
+    st.query_params.pop('session', None)
+    if state.get('logged_in') and state.get('user_data'):
+        if state.get('session_id'):
+            write_session_cookie(state.session_id, state.session_expires)
+        return True
+
+    session_id = st.context.cookies.get(SESSION_COOKIE)
+    if not session_id:
+        return False
+    found = get_session_store().lookup(session_id)
+    if found is None:
+        write_session_cookie('', 0)
+        return False
+    state.logged_in = True
+    state.user_data, state.session_expires = found
+    state.remember_me = True
+    state.session_id = session_id
+    return True
+
+
+def end_session():
+    if st.session_state.get('session_id'):
+        get_session_store().delete(st.session_state.session_id)
+    st.session_state.logged_in = False
+    st.session_state.user_data = None
+    st.session_state.session_id = None
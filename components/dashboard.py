@@ -7,33 +7,31 @@ from components.utils import *
 def show_dashboard():
     st.header("📊 Recommendation Dashboard")
     
-    # Fetch all recommendations
-    all_recommendations = fetch_all_recommendations()
+    # Totals and chart data are aggregated in SQLite, rollups of history past
+    # the retention window included; only the table reads rows, a page at a time
+    summary = fetch_history_summary()
+    total = summary['total']
     
-    if not all_recommendations:
+    if not total:
         st.info("No recommendations yet. Get some recommendations first!")
         return
     
-    # Convert to DataFrame
-    df = pd.DataFrame(all_recommendations, columns=['Movie', 'Genres', 'Rating', 'Date'])
-    df['Date'] = pd.to_datetime(df['Date'])
-    
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Recommendations", len(df))
+        st.metric("Total Recommendations", total)
     
     with col2:
-        avg_rating = df['Rating'].mean()
+        # Over the recommendations that had a rating
+        avg_rating = summary['rating_sum'] / summary['rated'] if summary['rated'] else 0.0
         st.metric("Average Rating", f"{avg_rating:.1f}/10")
     
     with col3:
-        unique_movies = df['Movie'].nunique()
-        st.metric("Unique Movies", unique_movies)
+        st.metric("Unique Movies", summary['unique_movies'], help="Within the recent history kept in full")
     
     with col4:
-        latest_date = df['Date'].max().strftime("%Y-%m-%d")
+        latest_date = summary['latest'][:10] if summary['latest'] else "-"
         st.metric("Latest Recommendation", latest_date)
     
     st.markdown("---")
@@ -44,20 +42,29 @@ def show_dashboard():
     with col1:
         # Ratings distribution
         st.subheader("Rating Distribution")
-        fig = px.histogram(df, x='Rating', nbins=10, title="Distribution of Movie Ratings")
+        rating_df = pd.DataFrame(summary['ratings'], columns=['Rating', 'Count'])
+        fig = px.histogram(rating_df, x='Rating', y='Count', histfunc='sum', nbins=10, title="Distribution of Movie Ratings")
         st.plotly_chart(fig, use_container_width=True)
+        if summary['unbucketed_ratings']:
+            st.caption(f"Leaves out {summary['unbucketed_ratings']:,} older recommendations whose ratings "
+                       "were only kept as a daily average.")
     
     with col2:
         # Recommendations over time
         st.subheader("Recommendations Over Time")
-        time_df = df.groupby(df['Date'].dt.date).size().reset_index(name='Count')
+        time_df = pd.DataFrame(summary['daily'], columns=['Date', 'Count'])
+        time_df['Date'] = pd.to_datetime(time_df['Date'], errors='coerce')
         fig = px.line(time_df, x='Date', y='Count', title="Daily Recommendations")
         st.plotly_chart(fig, use_container_width=True)
     
     # Genre analysis
     st.subheader("Genre Analysis")
-    display_genre_pie_chart(all_recommendations)
+    display_genre_pie_chart(summary['genres'])
     
     # Recent recommendations table
     st.subheader("Recent Recommendations")
-    st.dataframe(df.head(10), use_container_width=True)
\ No newline at end of file
+    rows, next_cursor = fetch_recommendations_page(HISTORY_PAGE_SIZE, page_cursor('history_pages'))
+    df = pd.DataFrame(rows, columns=['Movie', 'Genres', 'Rating', 'Date'])
+    df['Date'] = pd.to_datetime(df['Date'])
+    st.dataframe(df, use_container_width=True)
+    page_controls('history_pages', next_cursor, summary['rows'], HISTORY_PAGE_SIZE)
@@ -2,6 +2,7 @@
 import streamlit as st
 from components.utils import *
 
+@st.fragment
 def get_movie_details():
     st.header("🎭 Movie Recommendations Based on Emotions")
     
@@ -19,38 +20,18 @@ def get_movie_details():
     
     if st.button('🎯 Get Recommendations', type="primary"):
         with st.spinner('Finding the perfect movies for you...'):
-            # Filter based on selected emotion and genre
-            recommended_movies = st.session_state.moviesemo[
-                st.session_state.moviesemo['emotions'].apply(lambda emotions: selected_emotion in emotions) |
-                st.session_state.moviesemo['genres'].apply(lambda genres: selected_genre in genres)
-            ].head(15)  # Limit to 15 movies
+            # Titles tagged with the emotion or genre, paired with catalog movie IDs (limit 15)
+            titles, movie_ids = get_engine().by_emotion(selected_emotion, selected_genre, limit=15)
             
             # Check if there are recommended movies
-            if not recommended_movies.empty:
-                st.success(f"Found {len(recommended_movies)} recommendations!")
+            if titles:
+                st.success(f"Found {len(titles)} recommendations!")
                 
-                # Get movie IDs
-                movie_ids = []
-                for _, row in recommended_movies.iterrows():
-                    matching_movies = st.session_state.movies[st.session_state.movies['title'] == row['title']]
-                    if not matching_movies.empty:
-                        movie_index = matching_movies.index[0]
-                        movie_id = st.session_state.movies.iloc[movie_index].movie_id
-                        movie_ids.append(movie_id)
-                
-                # Fetch details asynchronously
-                details_list = run_async(fetch_multiple_movie_details(movie_ids))
-                
-                # Display movies in a grid
-                cols = st.columns(3)
-                for idx, (_, row) in enumerate(recommended_movies.iterrows()):
-                    if idx >= len(details_list):
-                        break
-                    
-                    with cols[idx % 3]:
-                        details = details_list[idx]
+                # Stream cards into the grid as their details arrive
+                def render(slot, idx, details):
+                    with slot.container():
                         movie_card(
-                            row['title'],
+                            titles[idx],
                             details[0],
                             details[2],
                             details[4],
@@ -59,5 +40,7 @@ def get_movie_details():
                             movie_id=movie_ids[idx],
                             show_add_button=True
                         )
+                
+                stream_movie_cards(movie_ids, render)
             else:
                 st.warning("No recommendations found for this emotion and genre.")
\ No newline at end of file
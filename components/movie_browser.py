@@ -1,7 +1,9 @@
 # components/movie_browser.py
 import streamlit as st
 from components.utils import *
+from engine import ERROR_POSTER
 
+@st.fragment
 def paging_movies():
     st.header("📚 Browse All Movies")
     # Use get() with default value to ensure movie_number is always an integer
@@ -10,11 +12,13 @@ def paging_movies():
     # Search box
     search_query = st.text_input("Search movies", placeholder="Type to search...")
     
-    # Filter movies based on search
+    # Filter movies based on search, best fuzzy matches first
+    catalog = get_engine().catalog
     if search_query:
-        filtered_movies = st.session_state.movies[st.session_state.movies['title'].str.contains(search_query, case=False)]
+        matches = catalog.title_index.search(search_query, limit=None)
+        filtered_movies = catalog.movies.iloc[[position for position, _ in matches]]
     else:
-        filtered_movies = st.session_state.movies
+        filtered_movies = catalog.movies
     
     # Handle case when there are no movies
     if len(filtered_movies) == 0:
@@ -37,18 +41,18 @@ def paging_movies():
     with col1:
         if st.button("⬅️ Previous", disabled=current_page == 0):
             st.session_state.movie_number = max(0, movie_number - movies_per_page)
-            st.rerun()
+            st.rerun(scope="fragment")
     
     with col2:
         page = st.slider("Page", 1, total_pages, current_page + 1)
         if page != current_page + 1:
             st.session_state.movie_number = (page - 1) * movies_per_page
-            st.rerun()
+            st.rerun(scope="fragment")
     
     with col3:
         if st.button("Next ➡️", disabled=current_page >= total_pages - 1):
             st.session_state.movie_number = min(len(filtered_movies) - movies_per_page, movie_number + movies_per_page)
-            st.rerun()
+            st.rerun(scope="fragment")
     
     # Update local variable after potential changes
     movie_number = st.session_state.get('movie_number', 0) or 0
@@ -59,28 +63,44 @@ def paging_movies():
     
     st.write(f"Showing {start_idx + 1}-{end_idx} of {len(filtered_movies)} movies")
     
-    # Get movie IDs for current page
-    movie_ids = [filtered_movies.iloc[i].movie_id for i in range(start_idx, end_idx)]
+    # Resolved pages are cached per (query, page start) so back/forward is instant
+    page_key = (search_query, start_idx)
+    page_cache = st.session_state.browse_page_cache
+    if page_key in page_cache:
+        page_cache.move_to_end(page_key)
+        page_movies = page_cache[page_key]
+    else:
+        movie_ids = [filtered_movies.iloc[i].movie_id for i in range(start_idx, end_idx)]
+        titles = [filtered_movies.iloc[i].title for i in range(start_idx, end_idx)]
+        
+        # Fetch posters asynchronously
+        posters = run_async(fetch_multiple_posters(movie_ids))
+        page_movies = list(zip(movie_ids, titles, posters))
+        
+        # Don't keep pages with failed posters, the next visit should retry them
+        if ERROR_POSTER not in posters:
+            page_cache[page_key] = page_movies
+            if len(page_cache) > PAGE_CACHE_SIZE:
+                page_cache.popitem(last=False)
     
-    # Fetch posters asynchronously
-    poster_urls = run_async(fetch_multiple_posters(movie_ids))
+    # Speculatively fetch the neighbouring pages' posters in the background
+    for neighbour_start in (start_idx - movies_per_page, end_idx):
+        if 0 <= neighbour_start < len(filtered_movies) and (search_query, neighbour_start) not in page_cache:
+            neighbour_end = min(neighbour_start + movies_per_page, len(filtered_movies))
+            prefetch_posters([filtered_movies.iloc[i].movie_id for i in range(neighbour_start, neighbour_end)],
+                             GRID_POSTER_WIDTH)
     
     # Display movies in a grid with add to watchlist buttons
+    poster_sources = local_posters([poster for _, _, poster in page_movies], GRID_POSTER_WIDTH)
     cols = st.columns(5)
-    for i in range(start_idx, end_idx):
-        col_idx = (i - start_idx) % 5
-        with cols[col_idx]:
-            poster_idx = i - start_idx
-            if poster_idx < len(poster_urls) and poster_urls[poster_idx]:
-                st.image(poster_urls[poster_idx], use_column_width=True)
+    for offset, ((movie_id, movie_title, poster), poster_source) in enumerate(zip(page_movies, poster_sources)):
+        i = start_idx + offset
+        with cols[offset % 5]:
+            if poster:
+                st.image(poster_source, use_column_width=True)
             else:
                 st.write("No poster available")
             
-            movie_title = filtered_movies.iloc[i].title
-            movie_id = filtered_movies.iloc[i].movie_id
-            
             st.caption(movie_title)
             
-            if st.button("➕ Watchlist", key=f"watch_{movie_id}_{i}", use_container_width=True):
-                add_to_watchlist(movie_id, movie_title)
-                st.success(f"Added {movie_title} to watchlist!")
\ No newline at end of file
+            watchlist_button(movie_id, movie_title, key=f"watch_{movie_id}_{i}")
\ No newline at end of file
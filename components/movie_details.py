@@ -1,42 +1,39 @@
 # components/movie_details.py
 import streamlit as st
-from datetime import datetime
 from components.utils import *
 
+@st.fragment
 def movie_description():
     st.header("ℹ️ Movie Details")
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        selected_movie_name = st.selectbox(
-            'Select a movie:', 
-            st.session_state.movies['title'].values,
-            key="detail_select"
-        )
+        selected_movie_name = movie_picker('Select a movie:', key="detail_select")
+        if selected_movie_name is not None:
+            prefetch_details(selected_movie_name)
     
     with col2:
-        if st.button('Get Details', type="primary"):
+        if st.button('Get Details', type="primary", disabled=selected_movie_name is None):
             with st.spinner('Fetching movie details...'):
-                matching_movies = st.session_state.movies[st.session_state.movies['title'] == selected_movie_name]
-                if not matching_movies.empty:
-                    movie_index = matching_movies.index[0]
-                    movie_id = st.session_state.movies.iloc[movie_index].movie_id
+                catalog = get_engine().catalog
+                movie_index = catalog.position(selected_movie_name)
+                if movie_index is not None:
+                    movie_id = catalog.movie_id(movie_index)
                     details = run_async(fetch_multiple_movie_details([movie_id]))[0]
                     
                     if details:
-                        poster_url, overview, rating, release_date, genres, budget, revenue, runtime, spoken_languages, tagline, production_companies, imdb_id, homepage = details
+                        poster, overview, rating, release_date, genres, budget, revenue, runtime, spoken_languages, tagline, production_companies, imdb_id, homepage = details
+                        view = movie_view(rating, genres, release_date, overview)
                         
                         # Display movie details in a nice layout
                         col1, col2 = st.columns([1, 2])
                         
                         with col1:
-                            st.image(poster_url, use_column_width=True)
+                            st.image(poster_image(poster, DETAIL_POSTER_WIDTH), use_column_width=True)
                             
                             # Add to watchlist button
-                            if st.button("➕ Add to Watchlist", use_container_width=True):
-                                add_to_watchlist(movie_id, selected_movie_name)
-                                st.success(f"Added {selected_movie_name} to watchlist!")
+                            watchlist_button(movie_id, selected_movie_name, key=f"detail_add_{movie_id}", label="➕ Add to Watchlist")
                         
                         with col2:
                             st.markdown(f"# {selected_movie_name}")
@@ -45,8 +42,7 @@ def movie_description():
                                 st.markdown(f"*{tagline}*")
                             
                             # Rating
-                            stars = "⭐" * int(rating / 2)
-                            st.markdown(f"### {stars} {rating}/10")
+                            st.markdown(f"### {view.stars} {rating}/10")
                             
                             # Details in columns
                             col11, col12, col13 = st.columns(3)
@@ -55,23 +51,15 @@ def movie_description():
                                 st.metric("Runtime", f"{runtime} min" if runtime else "Unknown")
                             
                             with col12:
-                                if release_date and release_date != "Unknown":
-                                    try:
-                                        release_date_formatted = datetime.strptime(release_date, "%Y-%m-%d").strftime("%d %b %Y")
-                                        st.metric("Release Date", release_date_formatted)
-                                    except:
-                                        st.metric("Release Date", release_date)
-                                else:
-                                    st.metric("Release Date", "Unknown")
+                                st.metric("Release Date", view.release_label or "Unknown")
                             
                             with col13:
                                 st.metric("Budget", f"${budget:,}" if budget else "Unknown")
                             
                             # Genres
                             st.markdown("#### Genres")
-                            if genres and genres[0] != "Unknown":
-                                genres_html = " ".join([f'<span style="background-color: #f0f2f6; padding: 4px 8px; border-radius: 12px; margin: 2px; font-size: 12px;">{genre}</span>' for genre in genres])
-                                st.markdown(genres_html, unsafe_allow_html=True)
+                            if view.genre_badges:
+                                st.markdown(view.genre_badges, unsafe_allow_html=True)
                             
                             # Overview
                             st.markdown("#### Overview")
@@ -2,6 +2,7 @@
 import streamlit as st
 from components.utils import *
 
+@st.fragment
 def show_preferences():
     st.header("⚙️ My Preferences")
     
@@ -48,7 +49,7 @@ def show_preferences():
             recommended_movies = []
             recommended_movies_ids = []
             
-            for idx, row in st.session_state.movies.iterrows():
+            for idx, row in get_engine().catalog.movies.iterrows():
                 movie_id = row.movie_id
                 details = run_async(fetch_multiple_movie_details([movie_id]))[0]
                 
@@ -1,67 +1,86 @@
 # components/recommender.py
 import streamlit as st
-import random
 from components.utils import *
+from engine import passes_filters
 
-def recommend(movie, num_recommendations, genre_filter=None, randomize=False, rating_filter=None):
-    if randomize:
-        random_movies_list = random.sample(range(len(st.session_state.movies)), min(num_recommendations, len(st.session_state.movies)))
-    else:
-        movie_index = st.session_state.movies[st.session_state.movies['title'] == movie].index[0]
-        distances = st.session_state.similarity[movie_index]
-        movies_list = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:num_recommendations + 1]
-        random_movies_list = [x[0] for x in movies_list]
-
-    # Get movie IDs
-    movie_ids = [st.session_state.movies.iloc[idx].movie_id for idx in random_movies_list]
-    
-    # Fetch details asynchronously
-    details_list = run_async(fetch_multiple_movie_details(movie_ids))
-    
-    recommended_movies = []
-    recommended_movies_posters = []
-    recommended_movies_overviews = []
-    recommended_movies_ratings = []
-    recommended_movies_genres = []
-    recommended_movies_release_date = []
-    recommended_movies_ids = []
-
-    for idx, details in zip(random_movies_list, details_list):
-        poster, overview, rating, release_date, genres, budget, revenue, runtime, spokenlang, tagline, productioncomp, imdb_id, homepage = details
-
-        # Apply genre filter if specified
-        if genre_filter and genre_filter not in genres:
-            continue
-
-        # Apply rating filter if specified
-        if rating_filter and rating < rating_filter:
-            continue
-
-        recommended_movies.append(st.session_state.movies.iloc[idx].title)
-        recommended_movies_posters.append(poster)
-        recommended_movies_overviews.append(overview)
-        recommended_movies_ratings.append(rating)
-        recommended_movies_genres.append(genres)
-        recommended_movies_release_date.append(release_date)
-        recommended_movies_ids.append(st.session_state.movies.iloc[idx].movie_id)
-
-        # Insert the recommended movie into the database
-        insert_recommendation(st.session_state.movies.iloc[idx].title, genres, rating)
-
-    return recommended_movies, recommended_movies_posters, recommended_movies_overviews, recommended_movies_ratings, recommended_movies_genres, recommended_movies_release_date, recommended_movies_ids
+def recommend_from_watchlist(k, pooling='sum'):
+    return get_engine().from_watchlist(k, pooling)
+
+def recommend(movie, num_recommendations, genre_filter=None, randomize=False, rating_filter=None, diversity=0.0):
+    return run_async(get_engine().recommend_async(movie, num_recommendations, genre_filter, randomize, rating_filter, diversity))
+
+# Render recommendation cards as their details arrive instead of after the slowest fetch
+def stream_recommendations(movie, num_recommendations, genre_filter=None, randomize=False, rating_filter=None, diversity=0.0):
+    engine = get_engine()
+    if not randomize:
+        cache_key = engine.cache_key(movie, num_recommendations, genre_filter, rating_filter, diversity)
+        cached = engine.cache.get(cache_key)
+        if cached is not None:
+            engine.record(cached)
+            show_recommendations(cached)
+            return len(cached.titles)
+
+    positions = engine.candidates(movie, num_recommendations, randomize, diversity)
+    titles = [engine.catalog.title(idx) for idx in positions]
+    movie_ids = [engine.catalog.movie_id(idx) for idx in positions]
+    arrived = {}
+
+    def render(slot, position, details):
+        arrived[position] = details
+        if not passes_filters(details, genre_filter, rating_filter):
+            return False
+
+        poster, overview, rating, release_date, genres = details[:5]
+        with slot.container():
+            movie_card(
+                titles[position],
+                poster,
+                rating,
+                genres,
+                release_date,
+                overview,
+                movie_id=movie_ids[position],
+                show_add_button=True
+            )
+        insert_recommendation(titles[position], genres, rating)
+
+    shown = stream_movie_cards(movie_ids, render)
+
+    if not randomize:
+        engine.store(cache_key, positions, [arrived[position] for position in range(len(positions))], genre_filter, rating_filter)
+    return shown
 
+# Display recommend() results in a responsive grid
+def show_recommendations(result):
+    names, posters, overviews, ratings, genres, release_date, movie_ids = result
+    cols = st.columns(3)
+    for i in range(len(names)):
+        with cols[i % 3]:
+            movie_card(
+                names[i],
+                posters[i],
+                ratings[i],
+                genres[i],
+                release_date[i],
+                overviews[i],
+                movie_id=movie_ids[i],
+                show_add_button=True
+            )
+
+# The recent table is drawn in the same fragment, so it shows this click's results
+@st.fragment
 def recommend_display():
+    find_similar_movies()
+    show_recent_recommendations()
+
+def find_similar_movies():
     st.header("🎬 Find Similar Movies")
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
         # Searchable input for selecting a movie
-        selected_movie_name = st.selectbox(
-            'Select a movie:', 
-            st.session_state.movies['title'].values,
-            key="movie_select"
-        )
+        selected_movie_name = movie_picker('Select a movie:', key="movie_select")
     
     with col2:
         # Using slider for the number of recommendations
@@ -78,33 +97,49 @@ def recommend_display():
         # Optional rating filter
         rating_filter = st.slider('Minimum Rating', min_value=0.0, max_value=10.0, value=5.0, step=0.5, key="rating_filter")
 
-    if st.button('🔍 Find Recommendations', type="primary"):
+    # Higher diversity spreads results across franchises instead of listing sequels
+    diversity = st.slider('Diversity', min_value=0.0, max_value=0.9, value=0.0, step=0.1, key="diversity",
+                          help="0 ranks purely by similarity; higher values penalise near-duplicates", disabled=randomize)
+
+    stream_results = st.checkbox('Show results as they arrive', value=True, key="stream_results")
+
+    # Warm the TMDB records the button is about to ask for
+    if selected_movie_name is not None and not randomize:
+        prefetch_details(selected_movie_name, num_recommendations, diversity)
+
+    if st.button('🔍 Find Recommendations', type="primary", disabled=selected_movie_name is None and not randomize):
         with st.spinner('Analyzing similar movies...'):
-            names, posters, overviews, ratings, genres, release_date, movie_ids = recommend(
+            if stream_results:
+                status = st.empty()
+                shown = stream_recommendations(
+                    selected_movie_name,
+                    num_recommendations,
+                    genre_filter=st.session_state.get('selected_genre'),
+                    randomize=randomize,
+                    rating_filter=rating_filter,
+                    diversity=diversity
+                )
+                if shown:
+                    status.success(f"Found {shown} recommendations!")
+                else:
+                    status.warning("No movies match your criteria. Try adjusting your filters.")
+                
+                # Update recent recommendations
+                st.session_state.recent_recommendations = fetch_recommendations()
+                return
+
+            result = recommend(
                 selected_movie_name, 
                 num_recommendations, 
                 genre_filter=st.session_state.get('selected_genre'), 
                 randomize=randomize, 
-                rating_filter=rating_filter
+                rating_filter=rating_filter,
+                diversity=diversity
             )
             
-            if names:
-                st.success(f"Found {len(names)} recommendations!")
-                
-                # Display movies in a responsive grid
-                cols = st.columns(3)
-                for i in range(len(names)):
-                    with cols[i % 3]:
-                        movie_card(
-                            names[i],
-                            posters[i],
-                            ratings[i],
-                            genres[i],
-                            release_date[i],
-                            overviews[i],
-                            movie_id=movie_ids[i],
-                            show_add_button=True
-                        )
+            if result[0]:
+                st.success(f"Found {len(result[0])} recommendations!")
+                show_recommendations(result)
             else:
                 st.warning("No movies match your criteria. Try adjusting your filters.")
                 
@@ -0,0 +1,89 @@
+# components/render_model.py
+from datetime import datetime
+from typing import NamedTuple
+
+from engine.result_cache import DETAILS_CACHE_SIZE, LRUCache
+
+# As many views as TMDB records, so a cached record never has to be re-rendered
+RENDER_CACHE_SIZE = DETAILS_CACHE_SIZE
+CARD_OVERVIEW_CHARS = 100
+LIST_OVERVIEW_CHARS = 150
+CARD_BADGE_GENRES = 2
+
+CARD_BADGE = '<span style="background-color: #242c3b; padding: 4px 8px; border-radius: 12px; margin: 2px; font-size: 11px; display: inline-block;">{}</span>'
+GENRE_BADGE = '<span style="background-color: #f0f2f6; padding: 4px 8px; border-radius: 12px; margin: 2px; font-size: 12px;">{}</span>'
+
+
+class MovieView(NamedTuple):
+    """Display-ready fields of one movie record; empty strings mean "don't show".
+
+    Built once per record by ``movie_view`` and shared by every session, so
+    the card, watchlist and details pages only emit widgets on reruns.
+    """
+    stars: str
+    rating_label: str
+    release_label: str
+    card_badges: str
+    genre_badges: str
+    card_overview: str
+    list_overview: str
+
+
+# Limit overview text
+def limit_overview(overview, char_limit=100):
+    if not overview or overview == "No overview available":
+        return "No overview available"
+
+    if len(overview) <= char_limit:
+        return overview
+
+    truncated = overview[:char_limit]
+    sentence_end = max(truncated.rfind('.'), truncated.rfind('!'), truncated.rfind('?'))
+
+    if sentence_end != -1:
+        return truncated[:sentence_end + 1]  # Include the punctuation
+
+    word_boundary = truncated.rfind(' ')
+    if word_boundary != -1:
+        return truncated[:word_boundary] + "..."
+
+    return truncated + "..."
+
+
+def format_release_date(release_date):
+    if not release_date or release_date == "Unknown":
+        return ""
+    try:
+        return datetime.strptime(release_date, "%Y-%m-%d").strftime("%d %b %Y")
+    except ValueError:
+        return release_date
+
+
+def build_view(rating, genres, release_date, overview):
+    rating = rating or 0.0
+    stars = "⭐" * min(5, int(rating / 2)) if rating > 0 else ""
+    has_genres = bool(genres) and genres[0] != "Unknown"
+    has_overview = bool(overview) and overview != "No overview available"
+    return MovieView(
+        stars=stars,
+        rating_label=f"{stars} ({rating:.1f}/10)" if rating > 0 else "",
+        release_label=format_release_date(release_date),
+        card_badges=" ".join(CARD_BADGE.format(genre) for genre in genres[:CARD_BADGE_GENRES]) if has_genres else "",
+        genre_badges=" ".join(GENRE_BADGE.format(genre) for genre in genres) if has_genres else "",
+        card_overview=limit_overview(overview, CARD_OVERVIEW_CHARS) if has_overview else "",
+        list_overview=limit_overview(overview, LIST_OVERVIEW_CHARS) if has_overview else "",
+    )
+
+
+# Process-wide, keyed by the record's displayed fields: records come out of
+# the TMDB details cache as the same objects, so the key hashes are cached too
+view_cache = LRUCache(RENDER_CACHE_SIZE)
+
+
+def movie_view(rating, genres, release_date, overview):
+    key = (rating, tuple(genres or ()), release_date, overview)
+    view = view_cache.get(key)
+    if view is None:
+        view = build_view(rating, genres or [], release_date, overview)
+        view_cache.put(key, view)
+    return view
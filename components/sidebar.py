@@ -1,7 +1,7 @@
 # components/sidebar.py
 import streamlit as st
 from streamlit_option_menu import option_menu
-import sqlite3
+from components.utils import get_storage, recommendation_cache
 
 def make_sidebar():
     with st.sidebar:
@@ -10,12 +10,12 @@ def make_sidebar():
         
         # Navigation
         st.subheader("Navigation")
-        menu_options = ['Dashboard', 'Recommend Similar Movies', 'Recommend by Emotions', 'Movie Details', 
-                       'Browse All Movies', 'My Watchlist', 'My Preferences']
+        menu_options = ['Dashboard', 'Recommend Similar Movies', 'Recommend by Emotions', 'Because You Watched',
+                       'Movie Details', 'Browse All Movies', 'My Watchlist', 'My Preferences']
         selected = option_menu(
             menu_title=None,
             options=menu_options,
-            icons=['search-heart', 'emoji-smile', 'info-circle', 'film', 'bookmark', 'gear', 'bar-chart'],
+            icons=['search-heart', 'emoji-smile', 'info-circle', 'collection-play', 'film', 'bookmark', 'gear', 'bar-chart'],
             default_index=0,
             orientation="vertical",
             styles={
@@ -43,14 +43,9 @@ def make_sidebar():
         
         # Stats
         st.subheader("Stats")
-        conn = sqlite3.connect("movies.db")
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*) FROM recommended_movies")
-        total_recommendations = c.fetchone()[0]
-        
-        c.execute("SELECT COUNT(*) FROM watchlist WHERE user_id = ?", ("default_user",))
-        watchlist_count = c.fetchone()[0]
-        conn.close()
+        storage = get_storage()
+        total_recommendations = storage.count_recommendations()
+        watchlist_count = storage.count_watchlist()
         
         col1, col2 = st.columns(2)
         with col1:
@@ -58,5 +53,10 @@ def make_sidebar():
         with col2:
             st.metric("My Watchlist", watchlist_count)
         
+        cache_stats = recommendation_cache.stats()
+        lookups = cache_stats['hits'] + cache_stats['misses']
+        st.caption(f"Recommendation cache: {cache_stats['hit_rate']:.0%} hits "
+                   f"({cache_stats['hits']}/{lookups} lookups, {cache_stats['size']} cached)")
+        
         st.markdown("---")
         st.caption("Made with ❤️ using Streamlit")
\ No newline at end of file
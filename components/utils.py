@@ -1,34 +1,45 @@
 # components/utils.py
+# Every page imports this module, so it only imports what every page needs;
+# heavier libraries (plotly, and the engine with pandas and aiohttp) are
+# imported inside the functions that use them
 import streamlit as st
-import sqlite3
-import pandas as pd
-import plotly.express as px
-from datetime import datetime
+import time
 import asyncio
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import pickle
 import os
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
+from components.render_model import movie_view
+from engine.result_cache import RECOMMENDATION_CACHE_SIZE, LRUCache
 
 # Load environment variables
 load_dotenv()
 
 # Constants
 API_KEY = os.getenv('API_KEY')
-POSTER_PLACEHOLDER = "https://res.cloudinary.com/dh5cebjwj/image/upload/v1758476649/download_idywpr.png"
-ERROR_POSTER = "https://via.placeholder.com/200x300?text=Error+Loading"
+PICKER_MAX_OPTIONS = 50
+PAGE_CACHE_SIZE = 32
+# Rows per page of the history table and the watchlist
+HISTORY_PAGE_SIZE = 10
+WATCHLIST_PAGE_SIZE = 10
+# Poster widths each view actually draws, in CSS pixels
+GRID_POSTER_WIDTH = 185       # one of five browse grid columns
+CARD_POSTER_WIDTH = 185       # left third of a card in a three-column layout
+WATCHLIST_POSTER_WIDTH = 150
+DETAIL_POSTER_WIDTH = 342
+
+# Process-wide, shared by every session and kept across engine reloads
+recommendation_cache = LRUCache(RECOMMENDATION_CACHE_SIZE)
 
 def init_session_state():
     for key in ['show_all_recommendations', 'movie_number', 'selected_movie_name', 
-                'user_menu', 'recent_recommendations', 'poster_cache', 
-                'movie_details_cache', 'movies_loaded', 'similarity_loaded',
-                'movies', 'similarity', 'moviesemo']:
+                'user_menu', 'recent_recommendations', 'movies_loaded', 'similarity_loaded',
+                'browse_page_cache', 'poster_prefetches', 'detail_prefetches']:
         if key not in st.session_state:
-            if key in ['poster_cache', 'movie_details_cache']:
+            if key in ['poster_prefetches', 'detail_prefetches']:
                 st.session_state[key] = {}
+            elif key == 'browse_page_cache':
+                st.session_state[key] = OrderedDict()
             elif key == 'recent_recommendations':
                 st.session_state[key] = []
             elif key in ['movies_loaded', 'similarity_loaded']:
@@ -37,220 +48,218 @@ def init_session_state():
                 st.session_state[key] = 0   # 👈 force integer
             else:
                 st.session_state[key] = None
+# SQLite storage of the engine; the functions below are the page-facing API
+def get_storage():
+    return get_engine().storage
+
 # Initialize the database
 def init_db():
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS recommended_movies
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                movie_title TEXT,
-                genres TEXT,
-                rating REAL,
-                recommendation_date TEXT)''')
-    
-    # Create user preferences table
-    c.execute('''CREATE TABLE IF NOT EXISTS user_preferences
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                preferred_genres TEXT,
-                min_rating REAL,
-                created_date TEXT)''')
-    
-    # Create watchlist table
-    c.execute('''CREATE TABLE IF NOT EXISTS watchlist
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                movie_id INTEGER,
-                movie_title TEXT,
-                added_date TEXT)''')
-    
-    conn.commit()
-    conn.close()
+    get_storage().init()
 
 # Insert recommended movie data into the database
 def insert_recommendation(movie_title, genres, rating):
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute("INSERT INTO recommended_movies (movie_title, genres, rating, recommendation_date) VALUES (?, ?, ?, ?)",
-            (movie_title, ', '.join(genres), rating, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+    get_storage().insert_recommendation(movie_title, genres, rating)
 
 # Fetch the last recommended movies from the database
 def fetch_recommendations(limit=10):
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute("SELECT movie_title, genres, rating, recommendation_date FROM recommended_movies ORDER BY id DESC LIMIT ?", (limit,))
-    data = c.fetchall()
-    conn.close()
-    return data
-
-# Fetch all recommendations from the database
-def fetch_all_recommendations():
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute("SELECT movie_title, genres, rating, recommendation_date FROM recommended_movies ORDER BY id DESC")
-    data = c.fetchall()
-    conn.close()
-    return data
+    return get_storage().fetch_recommendations(limit)
+
+# One page of history, newest first, and the cursor of the next page
+def fetch_recommendations_page(limit=HISTORY_PAGE_SIZE, before=None):
+    return get_storage().recommendations_page(limit, before)
+
+# Dashboard totals and chart data, aggregated in SQLite instead of loading every row
+def fetch_history_summary():
+    return get_storage().history_summary()
 
 # Clear all recommended movies from the database
 def clear_recommendations():
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute("DELETE FROM recommended_movies")
-    conn.commit()
-    conn.close()
+    get_storage().clear_recommendations()
 
 # Add movie to watchlist
 def add_to_watchlist(movie_id, movie_title):
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    # Using a default user_id for simplicity
-    c.execute("INSERT INTO watchlist (user_id, movie_id, movie_title, added_date) VALUES (?, ?, ?, ?)",
-            ("default_user", movie_id, movie_title, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+    get_storage().add_to_watchlist(movie_id, movie_title)
 
 # Get watchlist
 def get_watchlist():
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute("SELECT movie_id, movie_title FROM watchlist WHERE user_id = ? ORDER BY added_date DESC", ("default_user",))
-    data = c.fetchall()
-    conn.close()
-    return data
+    return get_storage().get_watchlist()
+
+# One page of the watchlist, newest first, and the cursor of the next page
+def get_watchlist_page(limit=WATCHLIST_PAGE_SIZE, after=None):
+    return get_storage().watchlist_page(limit, after)
+
+# Number of movies in the watchlist
+def count_watchlist():
+    return get_storage().count_watchlist()
 
 # Remove from watchlist
 def remove_from_watchlist(movie_id):
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute("DELETE FROM watchlist WHERE user_id = ? AND movie_id = ?", ("default_user", movie_id))
-    conn.commit()
-    conn.close()
+    get_storage().remove_from_watchlist(movie_id)
 
 # Save user preferences
 def save_user_preferences(preferred_genres, min_rating):
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    # Using a default user_id for simplicity
-    c.execute("INSERT OR REPLACE INTO user_preferences (user_id, preferred_genres, min_rating, created_date) VALUES (?, ?, ?, ?)",
-            ("default_user", ','.join(preferred_genres), min_rating, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+    get_storage().save_preferences(preferred_genres, min_rating)
 
 # Get user preferences
 def get_user_preferences():
-    conn = sqlite3.connect("movies.db")
-    c = conn.cursor()
-    c.execute("SELECT preferred_genres, min_rating FROM user_preferences WHERE user_id = ? ORDER BY id DESC LIMIT 1", ("default_user",))
-    data = c.fetchone()
-    conn.close()
-    
-    if data:
-        return data[0].split(','), data[1]
-    return [], 5.0
+    return get_storage().get_preferences()
 
 # Function to display the pie chart of genres
-def display_genre_pie_chart(recommendations):
-    genre_count = {}
-    for rec in recommendations:
-        genres = rec[1].split(', ')
-        for genre in genres:
-            if genre in genre_count:
-                genre_count[genre] += 1
-            else:
-                genre_count[genre] = 1
-
+def display_genre_pie_chart(genre_count):
+    # genre -> recommendations, as aggregated by fetch_history_summary()
     genre_labels = list(genre_count.keys())
     genre_values = list(genre_count.values())
 
     # Plotting the pie chart
     if genre_labels:
+        import plotly.express as px
         fig = px.pie(values=genre_values, names=genre_labels, title="Recommended Movies by Genre")
         st.plotly_chart(fig)
     else:
         st.info("No genre data available to display.")
 
-# Load data with caching
+# Keyset pagination controls: the session keeps the cursor of every page
+# visited under `key`, so Previous pops one and Next pushes the one the
+# current page returned. Returns the cursor of the page to show.
+def page_cursor(key):
+    return st.session_state.setdefault(key, [None])[-1]
+
+def page_controls(key, next_cursor, total=None, page_size=None):
+    cursors = st.session_state.setdefault(key, [None])
+
+    def previous():
+        cursors.pop()
+
+    def next_page():
+        cursors.append(next_cursor)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("⬅️ Previous", key=f"{key}_previous", on_click=previous, disabled=len(cursors) == 1)
+    with col2:
+        label = f"Page {len(cursors)}"
+        if total is not None and page_size:
+            label += f" of {max(1, -(-total // page_size))}"
+        st.markdown(f"<div style='text-align: center;'>{label}</div>", unsafe_allow_html=True)
+    with col3:
+        st.button("Next ➡️", key=f"{key}_next", on_click=next_page, disabled=next_cursor is None)
+
+# One storage and TMDB client per process, kept across engine reloads
 @st.cache_resource
-def load_data():
-    movies_dict = pickle.load(open('data/movie_dict.pkl', 'rb'))
-    movies_df = pd.DataFrame(movies_dict)
-    
-    similarity = pickle.load(open('data/similarity.pkl', 'rb'))
-    
-    from data.emo import movies_data
-    moviesemo = pd.DataFrame(movies_data)
-    moviesemo['emotions'] = moviesemo['emotions'].apply(lambda x: eval(x) if isinstance(x, str) else x)
-    moviesemo['genres'] = moviesemo['genres'].apply(lambda x: eval(x) if isinstance(x, str) else x)
-    
-    return movies_df, similarity, moviesemo
+def load_storage():
+    from engine import Storage
+    return Storage()
 
-# Async function to fetch movie details
-async def fetch_movie_details_async(movie_id, session):
-    # Check cache first
-    if movie_id in st.session_state.movie_details_cache:
-        return st.session_state.movie_details_cache[movie_id]
-    
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}"
-    params = {'api_key': API_KEY}
-    
-    try:
-        async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-            if response.status == 200:
-                data = await response.json()
-                
-                # Default values if data is missing
-                poster_path = "https://image.tmdb.org/t/p/w780/" + data.get('poster_path', '') if data.get('poster_path') else POSTER_PLACEHOLDER
-                
-                result = (
-                    poster_path,
-                    data.get('overview', 'No overview available'),
-                    data.get('vote_average', 0.0),
-                    data.get('release_date', 'Unknown'),
-                    [genre['name'] for genre in data.get('genres', [])],
-                    data.get('budget', 0),
-                    data.get('revenue', 0),
-                    data.get('runtime', 0),
-                    [lang['name'] for lang in data.get('spoken_languages', [])],
-                    data.get('tagline', 'No tagline available'),
-                    [comp['name'] for comp in data.get('production_companies', [])],
-                    data.get('imdb_id', ''),
-                    data.get('homepage', '')
-                )
-                
-                # Cache the result
-                st.session_state.movie_details_cache[movie_id] = result
-                return result
-            else:
-                raise Exception(f"HTTP error: {response.status}")
-                
-    except Exception as e:
-        result = (
-            POSTER_PLACEHOLDER,
-            "Details temporarily unavailable",
-            0.0,
-            "2000-01-01",
-            ["Unknown"],
-            0,
-            0,
-            0,
-            ["Unknown"],
-            "No tagline available",
-            ["Unknown"],
-            "",
-            ""
-        )
-        st.session_state.movie_details_cache[movie_id] = result
-        return result
+@st.cache_resource
+def load_metadata():
+    from engine import MetadataClient
+    return MetadataClient(API_KEY)
+
+# The engine is rebuilt when any artifact it was loaded from changes on disk
+@st.cache_resource(max_entries=1)
+def load_engine(version):
+    from engine import Recommender
+    return Recommender.load(API_KEY, storage=load_storage(), cache=recommendation_cache, metadata=load_metadata())
+
+# A session may bring its own engine (tests, benchmarks) in st.session_state.engine.
+# Signed-in sessions get the shared engine over their own user's storage
+def get_engine():
+    from engine import catalog_version
+    engine = st.session_state.get('engine') or load_engine(catalog_version())
+    user_data = st.session_state.get('user_data')
+    if user_data and 'id' in user_data:
+        return engine.for_user(user_data['id'])
+    return engine
+
+def get_metadata():
+    return get_engine().metadata
+
+# Poster thumbnails on local disk, shared by every session
+@st.cache_resource
+def load_poster_store():
+    from engine import PosterStore
+    return PosterStore()
+
+# Image sources for a batch of posters drawn `width` pixels wide. Posters are
+# cached as bare TMDB paths; each is fetched at the smallest TMDB size that
+# fills `width` and served as a local thumbnail once the background loop has
+# stored it, until then straight from TMDB
+def local_posters(posters, width):
+    from engine import ERROR_POSTER, poster_url
+    store = load_poster_store()
+    urls = [poster_url(poster, width) for poster in posters]
+    sources = [store.thumbnail(url, width) or url for url in urls]
+    missing = [url for url, source in zip(urls, sources)
+               if source == url and url and url != ERROR_POSTER]
+    if missing:
+        run_in_background(store.ensure_many(list(dict.fromkeys(missing)), width))
+    return sources
+
+def poster_image(poster, width):
+    return local_posters([poster], width)[0]
+
+# Type-ahead movie picker: only the top matches for the current query are
+# sent to the browser, never the whole catalog
+def movie_picker(label, key, max_options=PICKER_MAX_OPTIONS):
+    index = get_engine().catalog.title_index
+    query = st.text_input(
+        'Search titles',
+        key=f"{key}_search",
+        placeholder="Type a title, typos are fine..."
+    )
+
+    if query:
+        matches = index.search(query, limit=max_options)
+        if not matches:
+            st.caption("No titles match your search.")
+            return None
+        options = [position for position, _ in matches]
+    else:
+        # Without a query suggest the head of the catalog, keeping the last pick on top
+        options = list(range(min(max_options, len(index))))
+        picked = st.session_state.get(f"{key}_picked")
+        if picked is not None and picked < len(index):
+            options = [picked] + [position for position in options if position != picked][:max_options - 1]
+
+    position = st.selectbox(label, options, format_func=lambda position: index.titles[position], key=key)
+    st.session_state[f"{key}_picked"] = position
+    return index.titles[position]
 
 # Async function to fetch multiple movie details
-async def fetch_multiple_movie_details(movie_ids):
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_movie_details_async(movie_id, session) for movie_id in movie_ids]
-        results = await asyncio.gather(*tasks)
-        return results
+def fetch_multiple_movie_details(movie_ids):
+    return get_metadata().details_many(movie_ids)
+
+# Yield (position, details) pairs in completion order instead of waiting for all
+def iter_movie_details(movie_ids):
+    return get_metadata().iter_details(movie_ids)
+
+# Stream cards into fixed grid slots as soon as each movie's details arrive.
+# render(slot, position, details) draws into the slot and returns False to
+# leave it empty (e.g. filtered out). Returns the number of cards drawn.
+def stream_movie_cards(movie_ids, render, columns=3):
+    cols = st.columns(columns)
+    slots = [cols[i % columns].empty() for i in range(len(movie_ids))]
+    timing = st.empty()
+
+    started = time.perf_counter()
+    first_card = None
+    shown = 0
+
+    async def consume():
+        nonlocal first_card, shown
+        async for position, details in iter_movie_details(movie_ids):
+            if render(slots[position], position, details) is False:
+                continue
+            shown += 1
+            if first_card is None:
+                first_card = time.perf_counter() - started
+
+    run_async(consume())
+    total = time.perf_counter() - started
+
+    if shown:
+        timing.caption(f"⏱️ First card in {first_card:.2f}s · all {shown} in {total:.2f}s")
+    return shown
 
 # Function to run async code from sync context
 def run_async(coro):
@@ -261,43 +270,87 @@ def run_async(coro):
     finally:
         loop.close()
 
-# Async function to fetch posters
-async def fetch_posters_async(movie_id, session):
-    # Check cache first
-    if movie_id in st.session_state.poster_cache:
-        return st.session_state.poster_cache[movie_id]
-    
-    url = f'https://api.themoviedb.org/3/movie/{movie_id}'
-    params = {'api_key': API_KEY}
-    
-    try:
-        async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-            if response.status == 200:
-                data = await response.json()
-                
-                if 'poster_path' in data and data['poster_path']:
-                    poster_url = "https://image.tmdb.org/t/p/w780/" + data['poster_path']
-                    st.session_state.poster_cache[movie_id] = poster_url
-                    return poster_url
-                else:
-                    st.session_state.poster_cache[movie_id] = POSTER_PLACEHOLDER
-                    return POSTER_PLACEHOLDER
-            else:
-                raise Exception(f"HTTP error: {response.status}")
-                
-    except Exception as e:
-        st.session_state.poster_cache[movie_id] = ERROR_POSTER
-        return ERROR_POSTER
+# Shared event loop on a daemon thread for work that must not block a rerun
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+def get_background_loop():
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="background-loop", daemon=True).start()
+            _background_loop = loop
+    return _background_loop
+
+# Schedule a coroutine on the shared loop and return a concurrent.futures.Future
+def run_in_background(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop())
 
 # Async function to fetch multiple posters
-async def fetch_multiple_posters(movie_ids):
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_posters_async(movie_id, session) for movie_id in movie_ids]
-        results = await asyncio.gather(*tasks)
-        return results
+def fetch_multiple_posters(movie_ids):
+    return get_metadata().posters(movie_ids)
+
+# Poster URLs, then (with a width) their local thumbnails, in one background job;
+# runs off the script thread, so it gets the clients rather than looking them up
+async def fetch_and_thumbnail(metadata, store, movie_ids, width=None):
+    from engine import ERROR_POSTER, poster_url
+    posters = await metadata.posters(movie_ids)
+    if width:
+        await store.ensure_many([poster_url(poster, width) for poster in posters if poster != ERROR_POSTER], width)
+    return posters
+
+# Start `job(missing)` on the background loop for the movie IDs that are neither
+# cached nor already on their way; `pending` maps movie ID -> future per session
+def speculate(pending, movie_ids, is_cached, job):
+    missing = [movie_id for movie_id in dict.fromkeys(movie_ids)
+               if not is_cached(movie_id) and not (movie_id in pending and not pending[movie_id].done())]
+    if missing:
+        future = run_in_background(job(missing))
+        for movie_id in missing:
+            pending[movie_id] = future
+
+    # Forget finished prefetches so the bookkeeping stays small
+    for movie_id in [movie_id for movie_id, f in pending.items() if f.done()]:
+        del pending[movie_id]
+
+# Speculatively warm the poster cache without blocking the current run
+def prefetch_posters(movie_ids, width=None):
+    metadata = get_metadata()
+    store = load_poster_store()
+    speculate(st.session_state.poster_prefetches, movie_ids, metadata.has_poster,
+              lambda missing: fetch_and_thumbnail(metadata, store, missing, width))
+
+# A selection reruns the page before its button is clicked: start fetching the
+# selected movie's TMDB record, and with `neighbours` its top recommendations',
+# so the click usually finds them cached
+def prefetch_details(movie_title, neighbours=0, diversity=0.0):
+    engine = get_engine()
+    position = engine.catalog.position(movie_title)
+    if position is None:
+        return
+
+    positions = [position]
+    if neighbours:
+        try:
+            positions += engine.candidates(movie_title, neighbours, diversity=diversity)
+        except LookupError:
+            pass
+    movie_ids = [engine.catalog.movie_id(position) for position in positions]
+    metadata = engine.metadata
+    speculate(st.session_state.detail_prefetches, movie_ids, metadata.has_details, metadata.details_many)
+
+# Card-level watchlist action; a click reruns only this fragment, not the page
+@st.fragment
+def watchlist_button(movie_id, movie_title, key, label="➕ Watchlist"):
+    if st.button(label, key=key, use_container_width=True):
+        add_to_watchlist(movie_id, movie_title)
+        st.success(f"Added {movie_title} to watchlist!")
 
 # Movie card component with genre badges
-def movie_card(movie_title, poster_url, rating, genres, release_date, overview, width=200, movie_id=None, show_add_button=False):
+def movie_card(movie_title, poster, rating, genres, release_date, overview, width=200, movie_id=None, show_add_button=False):
+    # Dates, stars, badges and the short overview are formatted once per record
+    view = movie_view(rating, genres, release_date, overview)
     with st.container():
         # Main card container
         # st.markdown(f"""
@@ -308,61 +361,71 @@ def movie_card(movie_title, poster_url, rating, genres, release_date, overview,
         
         with col1:
             # Poster image
-            st.image(poster_url, width=width, use_column_width=True)
+            st.image(poster_image(poster, min(width, CARD_POSTER_WIDTH)), width=width, use_column_width=True)
             
             # Rating below poster
-            if rating and rating > 0:
-                stars = "⭐" * min(5, int(rating / 2))
-                st.caption(f"{stars} ({rating:.1f}/10)")
+            if view.rating_label:
+                st.caption(view.rating_label)
             
             # Add to watchlist button
             if show_add_button and movie_id:
-                if st.button("➕ Watchlist", key=f"add_{movie_id}", use_container_width=True):
-                    add_to_watchlist(movie_id, movie_title)
-                    st.success(f"Added {movie_title} to watchlist!")
+                watchlist_button(movie_id, movie_title, key=f"add_{movie_id}")
         
         with col2:
             # Movie title
             st.markdown(f"**{movie_title}**")
             
             # Release date
-            if release_date and release_date != "Unknown":
-                try:
-                    release_date_formatted = datetime.strptime(release_date, "%Y-%m-%d").strftime("%d %b %Y")
-                    st.caption(f"Released: {release_date_formatted}")
-                except:
-                    st.caption(f"Released: {release_date}")
+            if view.release_label:
+                st.caption(f"Released: {view.release_label}")
             
             # Genres as badges
-            
-            if genres and genres[0] != "Unknown":
-                badges_html = " ".join([f'<span style="background-color: #242c3b; padding: 4px 8px; border-radius: 12px; margin: 2px; font-size: 11px; display: inline-block;">{genre}</span>' for genre in genres[:2]])
-                st.markdown(badges_html, unsafe_allow_html=True)
+            if view.card_badges:
+                st.markdown(view.card_badges, unsafe_allow_html=True)
                 st.write("")  # Add some spacing
             
             # Overview with limited text
-            if overview and overview != "No overview available":
-                limited_overview = limit_overview(overview, 100)
-                st.write(limited_overview)
+            if view.card_overview:
+                st.write(view.card_overview)
         
         st.markdown("</div>", unsafe_allow_html=True)
 
-# Limit overview text
-def limit_overview(overview, char_limit=100):
-    if not overview or overview == "No overview available":
-        return "No overview available"
+# Recent recommendations reruns on its own, so its buttons don't re-render the page above;
+# pages that add recommendations call it at the end of their fragment to redraw it with them
+@st.fragment
+def show_recent_recommendations():
+    st.markdown("---")
+    st.header("📋 Recently Recommended Movies")
+    
+    # Load recent recommendations if not loaded
+    if not st.session_state.recent_recommendations:
+        st.session_state.recent_recommendations = fetch_recommendations()
+    
+    if st.session_state.recent_recommendations:
+        # Display as a table
+        import pandas as pd
+        df = pd.DataFrame(st.session_state.recent_recommendations, 
+                         columns=['Movie', 'Genres', 'Rating', 'Date'])
+        st.dataframe(df, use_container_width=True)
         
-    if len(overview) <= char_limit:
-        return overview
-
-    truncated = overview[:char_limit]
-    sentence_end = max(truncated.rfind('.'), truncated.rfind('!'), truncated.rfind('?'))
-
-    if sentence_end != -1:
-        return truncated[:sentence_end + 1]  # Include the punctuation
-
-    word_boundary = truncated.rfind(' ')
-    if word_boundary != -1:
-        return truncated[:word_boundary] + "..."
-
-    return truncated + "..."
\ No newline at end of file
+        # Actions
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            if st.button('🔄 Refresh Recommendations'):
+                st.session_state.recent_recommendations = fetch_recommendations()
+                st.rerun(scope="fragment")
+        
+        with col2:
+            if st.button('🗑️ Clear All Recommendations'):
+                clear_recommendations()
+                st.session_state.recent_recommendations = []
+                st.session_state.pop('history_pages', None)
+                st.success("All recommendations have been cleared!")
+                st.rerun()
+        
+        with col3:
+            if st.button('📊 Show Genre Distribution'):
+                display_genre_pie_chart(fetch_history_summary()['genres'])
+    else:
+        st.info("No recommendations yet. Get some recommendations first!")
@@ -0,0 +1,142 @@
+# components/warmup.py
+import asyncio
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# How many of the most-recommended titles get their TMDB records fetched up front
+WARMUP_TITLES = 50
+
+
+class Warmup:
+    """Loads everything the first page needs on a daemon thread, once per process.
+
+    Steps run in order; a failing step (e.g. TMDB unreachable) is recorded
+    and skipped, since every page can still load what it needs lazily.
+    The app only needs the first ``required`` steps (engine, title search,
+    storage) and ``ready`` is set once they are done; the TMDB and poster
+    steps after them only warm caches and keep running in the background.
+    ``progress`` and ``label`` are safe to read from any session while the
+    thread works.
+    """
+
+    def __init__(self, titles=WARMUP_TITLES):
+        self.titles = titles
+        self.engine = None
+        self.popular_ids = []
+        self.steps = [
+            ("🎬 Loading movie database...", self.load_engine),
+            ("🔎 Building title search...", self.build_title_index),
+            ("🗄️ Opening your history...", self.open_storage),
+            ("🤖 Fetching details for popular movies...", self.fetch_details),
+            ("🖼️ Preparing posters...", self.prepare_posters),
+        ]
+        self.required = 3
+        self.current = 0
+        self.errors = {}
+        self.timings = {}
+        self.ready = threading.Event()
+        self.finished = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+
+    def start(self):
+        # The steps call the app's st.cache_resource loaders, which expect a
+        # script context; the thread borrows the one of the run that starts it
+        add_script_run_ctx(self._thread, get_script_run_ctx())
+        self._thread.start()
+        return self
+
+    def run(self):
+        for index, (label, step) in enumerate(self.steps):
+            self.current = index
+            if index == self.required:
+                self.ready.set()
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[label] = e
+            self.timings[label] = time.perf_counter() - started
+        self.current = len(self.steps)
+        self.ready.set()
+        self.finished.set()
+        start_maintenance()
+
+    @property
+    def done(self):
+        return self.finished.is_set()
+
+    @property
+    def progress(self):
+        # Of the steps the login redirect waits for
+        return min(self.current, self.required) / self.required
+
+    @property
+    def label(self):
+        return self.steps[min(self.current, self.required - 1)][0]
+
+    def load_engine(self):
+        # Imported here, on the warm-up thread: the login page that starts the
+        # warm-up renders without paying for the app's imports
+        from components.utils import load_engine
+        from engine import catalog_version
+
+        # Same cache entry get_engine() reads, so pages find the engine already built
+        self.engine = load_engine(catalog_version())
+
+    def build_title_index(self):
+        self.engine.catalog.title_index
+
+    def open_storage(self):
+        # Also pulls the history table into SQLite's page cache
+        storage = self.engine.storage
+        storage.init()
+        catalog = self.engine.catalog
+        positions = [catalog.position(title) for title in storage.most_recommended(self.titles)]
+        self.popular_ids = [catalog.movie_id(position) for position in positions if position is not None]
+
+    def fetch_details(self):
+        if self.popular_ids:
+            asyncio.run(self.engine.metadata.details_many(self.popular_ids))
+
+    def prepare_posters(self):
+        from components.utils import CARD_POSTER_WIDTH, load_poster_store
+        from engine import ERROR_POSTER, poster_url
+
+        metadata = self.engine.metadata
+        posters = [metadata.details_cache.get(movie_id) for movie_id in self.popular_ids]
+        urls = [poster_url(details.poster, CARD_POSTER_WIDTH) for details in posters if details is not None]
+        if urls:
+            asyncio.run(load_poster_store().ensure_many([url for url in urls if url != ERROR_POSTER],
+                                                        CARD_POSTER_WIDTH))
+
+
+# Started by the first script run of the process (usually the login page) and
+# shared by every session after it
+@st.cache_resource
+def start_warmup():
+    return Warmup().start()
+
+
+# History retention and incremental VACUUM, every few hours for the life of the process
+@st.cache_resource
+def start_maintenance():
+    from components.utils import load_storage
+    from engine.retention import Maintenance
+
+    return Maintenance(load_storage()).start()
+
+
+# Show the warm-up's real progress until the app can open; cache warming continues after
+def wait_for_warmup(progress_bar, status_text, poll=0.1):
+    warmup = start_warmup()
+    while True:
+        done = warmup.ready.is_set()
+        progress_bar.progress(warmup.progress)
+        status_text.markdown(f"<div style='text-align: center; font-size: 1.1rem; color: #374151;'>{warmup.label}</div>",
+                             unsafe_allow_html=True)
+        if done:
+            return warmup
+        warmup.ready.wait(poll)
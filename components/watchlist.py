@@ -5,47 +5,53 @@ from components.utils import *
 def show_watchlist():
     st.header("📋 My Watchlist")
     
-    watchlist = get_watchlist()
+    # Only the current page is read and resolved against TMDB
+    watchlist, next_cursor = get_watchlist_page(WATCHLIST_PAGE_SIZE, page_cursor('watchlist_pages'))
     
     if not watchlist:
+        if len(st.session_state.watchlist_pages) > 1:
+            # The last page was emptied by removals, step back to the one before it
+            st.session_state.watchlist_pages.pop()
+            st.rerun()
         st.info("Your watchlist is empty. Add some movies to get started!")
         return
     
-    # Get movie details for watchlist items
+    # Stream each watchlist row in as soon as its details arrive
     movie_ids = [item[0] for item in watchlist]
-    details_list = run_async(fetch_multiple_movie_details(movie_ids))
     
-    # Display watchlist
-    for i, (movie_id, movie_title) in enumerate(watchlist):
-        if i < len(details_list):
-            details = details_list[i]
-            poster_url, overview, rating, release_date, genres, budget, revenue, runtime, spoken_languages, tagline, production_companies, imdb_id, homepage = details
-            
+    def render(slot, i, details):
+        movie_id, movie_title = watchlist[i]
+        poster, overview, rating, release_date, genres, budget, revenue, runtime, spoken_languages, tagline, production_companies, imdb_id, homepage = details
+        view = movie_view(rating, genres, release_date, overview)
+        
+        with slot.container():
             col1, col2 = st.columns([1, 4])
             
             with col1:
-                st.image(poster_url, width=150)
+                st.image(poster_image(poster, WATCHLIST_POSTER_WIDTH), width=WATCHLIST_POSTER_WIDTH)
             
             with col2:
                 st.subheader(movie_title)
                 
                 # Rating
-                stars = "⭐" * int(rating / 2)
-                st.caption(f"{stars} ({rating}/10)")
+                if view.rating_label:
+                    st.caption(view.rating_label)
                 
                 # Genres
-                if genres and genres[0] != "Unknown":
-                    genres_html = " ".join([f'<span style="background-color: #f0f2f6; padding: 4px 8px; border-radius: 12px; margin: 2px; font-size: 12px;">{genre}</span>' for genre in genres])
-                    st.markdown(genres_html, unsafe_allow_html=True)
+                if view.genre_badges:
+                    st.markdown(view.genre_badges, unsafe_allow_html=True)
                 
                 # Overview
-                if overview and overview != "No overview available":
-                    st.write(limit_overview(overview, 150))
+                if view.list_overview:
+                    st.write(view.list_overview)
                 
                 # Remove button
                 if st.button("🗑️ Remove from Watchlist", key=f"remove_{movie_id}"):
                     remove_from_watchlist(movie_id)
                     st.success(f"Removed {movie_title} from watchlist!")
                     st.rerun()
-        
-        st.markdown("---")
\ No newline at end of file
+            
+            st.markdown("---")
+    
+    stream_movie_cards(movie_ids, render, columns=1)
+    page_controls('watchlist_pages', next_cursor, count_watchlist(), WATCHLIST_PAGE_SIZE)
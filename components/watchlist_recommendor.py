@@ -0,0 +1,71 @@
+# components/watchlist_recommendor.py
+import streamlit as st
+from components.utils import *
+from components.recommendor import recommend_from_watchlist, passes_filters
+
+# The recent table is drawn in the same fragment, so it shows this click's results
+@st.fragment
+def because_you_watched():
+    recommend_watchlist_movies()
+    show_recent_recommendations()
+
+def recommend_watchlist_movies():
+    st.header("🍿 Because You Watched")
+    
+    watchlist = get_watchlist()
+    if not watchlist:
+        st.info("Your watchlist is empty. Add some movies to get recommendations based on it!")
+        return
+    
+    st.caption(f"Based on the {len(watchlist)} movies in your watchlist")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        num_recommendations = st.slider('Number of recommendations', min_value=1, max_value=25, value=9, key="watchlist_num_recs")
+    
+    with col2:
+        pooling = st.radio(
+            'Combine watchlist movies by',
+            ['sum', 'max'],
+            format_func=lambda option: {'sum': 'Overall similarity', 'max': 'Closest single match'}[option],
+            key="watchlist_pooling"
+        )
+    
+    with col3:
+        rating_filter = st.slider('Minimum Rating', min_value=0.0, max_value=10.0, value=5.0, step=0.5, key="watchlist_rating_filter")
+    
+    if st.button('🎯 Recommend from my Watchlist', type="primary"):
+        with st.spinner('Scoring the catalog against your watchlist...'):
+            positions, _ = recommend_from_watchlist(num_recommendations, pooling)
+            catalog = get_engine().catalog
+            titles = [catalog.title(idx) for idx in positions]
+            movie_ids = [catalog.movie_id(idx) for idx in positions]
+            genre_filter = st.session_state.get('selected_genre')
+            
+            def render(slot, position, details):
+                if not passes_filters(details, genre_filter, rating_filter):
+                    return False
+                
+                poster, overview, rating, release_date, genres = details[:5]
+                with slot.container():
+                    movie_card(
+                        titles[position],
+                        poster,
+                        rating,
+                        genres,
+                        release_date,
+                        overview,
+                        movie_id=movie_ids[position],
+                        show_add_button=True
+                    )
+                insert_recommendation(titles[position], genres, rating)
+            
+            status = st.empty()
+            shown = stream_movie_cards(movie_ids, render)
+            if shown:
+                status.success(f"Found {shown} recommendations!")
+            else:
+                status.warning("No movies match your criteria. Try adjusting your filters.")
+            
+            st.session_state.recent_recommendations = fetch_recommendations()
@@ -0,0 +1,33 @@
+# engine/__init__.py
+"""Headless recommendation engine: no Streamlit imports anywhere below here.
+
+    from engine import Recommender
+    recommender = Recommender.load(api_key=os.getenv('API_KEY'))
+    recommender.recommend('Avatar', 10)
+"""
+from importlib import import_module
+
+# Public names and the module each lives in. They are imported on first use,
+# so `python -m engine.ann` (or any other module's CLI) does not import the
+# module it is about to run through the package first.
+_EXPORTS = {
+    'MOVIES_PATH': 'engine.catalog', 'Catalog': 'engine.catalog',
+    'DETAILS_UNAVAILABLE': 'engine.metadata', 'ERROR_POSTER': 'engine.metadata',
+    'POSTER_PLACEHOLDER': 'engine.metadata', 'POSTER_SIZES': 'engine.metadata',
+    'UNAVAILABLE_DETAILS': 'engine.metadata', 'MetadataClient': 'engine.metadata',
+    'MovieDetails': 'engine.metadata', 'poster_url': 'engine.metadata',
+    'POSTER_DIR': 'engine.posters', 'THUMBNAIL_WIDTHS': 'engine.posters', 'PosterStore': 'engine.posters',
+    'Recommendations': 'engine.recommender', 'Recommender': 'engine.recommender',
+    'catalog_version': 'engine.recommender', 'passes_filters': 'engine.recommender',
+    'SIMILARITY_PATH': 'engine.similarity', 'SimilarityIndex': 'engine.similarity',
+    'DB_PATH': 'engine.storage', 'Storage': 'engine.storage',
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'engine' has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,214 @@
+# engine/ann.py
+"""Approximate nearest neighbours over the tag feature vectors (IVF).
+
+The catalog is clustered with spherical k-means into ``nlist`` inverted
+lists. A query scores the centroids, then only the movies in the ``nprobe``
+closest lists, so its cost is about ``nlist + nprobe * N / nlist`` dot
+products instead of N. ``nprobe`` is the recall/latency knob: it can be
+raised per query up to ``nlist``, where the search is exact.
+
+    python -m engine.ann build --nlist 256
+    python -m engine.ann evaluate --k 25 --nprobe 1 2 4 8 16 32
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from engine.neighbors import select_top_k
+from engine.result_cache import artifact_version
+from engine.similarity_build import FEATURES_PATH, FeatureStore
+
+ANN_PATH = 'data/ann_index.npz'
+DEFAULT_NPROBE = 32
+KMEANS_ITERATIONS = 10
+ASSIGN_BLOCK_ROWS = 8192
+
+
+def default_nlist(n):
+    return max(1, int(4 * np.sqrt(n)))
+
+
+def _assign(matrix, centroids):
+    """Closest centroid of every row, in row blocks to bound the N x nlist scores."""
+    labels = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], ASSIGN_BLOCK_ROWS):
+        labels[start:start + ASSIGN_BLOCK_ROWS] = (matrix[start:start + ASSIGN_BLOCK_ROWS] @ centroids.T).argmax(axis=1)
+    return labels
+
+
+def spherical_kmeans(matrix, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """Unit-length centroids maximising cosine to their members."""
+    from scipy import sparse
+
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+    centroids = matrix[rng.choice(n, nlist, replace=False)].toarray()
+    for _ in range(iterations):
+        labels = _assign(matrix, centroids)
+        membership = sparse.csr_matrix((np.ones(n, dtype=np.float32), (labels, np.arange(n))), shape=(nlist, n))
+        centroids = np.asarray((membership @ matrix).todense(), dtype=np.float32)
+
+        # Empty lists restart from random movies rather than staying dead
+        empty = np.flatnonzero(np.bincount(labels, minlength=nlist) == 0)
+        if empty.size:
+            centroids[empty] = matrix[rng.choice(n, empty.size, replace=False)].toarray()
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids, _assign(matrix, centroids)
+
+
+class IVFIndex:
+    """Inverted-file index: ``centroids`` plus the catalog rows of every list.
+
+    List ``l`` holds ``rows[offsets[l]:offsets[l + 1]]``. ``matrix`` is the
+    FeatureStore matrix the index was built from; it is not saved with the
+    index, ``version`` ties the two together.
+    """
+
+    def __init__(self, centroids, offsets, rows, matrix=None, version=None, nprobe=DEFAULT_NPROBE):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.matrix = matrix
+        self.version = version
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self):
+        return self.centroids.shape[0]
+
+    def __len__(self):
+        return self.rows.shape[0]
+
+    @classmethod
+    def build(cls, matrix, nlist=None, iterations=KMEANS_ITERATIONS, seed=0, nprobe=DEFAULT_NPROBE):
+        nlist = min(nlist or default_nlist(matrix.shape[0]), matrix.shape[0])
+        centroids, labels = spherical_kmeans(matrix, nlist, iterations, seed)
+        rows = np.argsort(labels, kind='stable').astype(np.int32)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=nlist))]).astype(np.int64)
+        return cls(centroids, offsets, rows, matrix, nprobe=nprobe)
+
+    def append(self, new_rows, first_row):
+        """Add catalog rows ``first_row, first_row + 1, ...`` to their closest lists.
+
+        Centroids stay as built, so a few appended movies cost one centroid
+        scoring each; after many, ``build`` again to re-balance the lists.
+        """
+        lists = np.split(self.rows, self.offsets[1:-1])
+        for offset, label in enumerate(_assign(new_rows, self.centroids)):
+            lists[label] = np.append(lists[label], first_row + offset)
+        self.rows = np.concatenate(lists).astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum([len(rows) for rows in lists])]).astype(np.int64)
+
+    def candidates(self, query, nprobe):
+        """Catalog rows in the ``nprobe`` lists whose centroids best match ``query``."""
+        # Only the query's few nonzero terms matter, gather those centroid columns
+        centroid_scores = self.centroids[:, query.indices] @ query.data
+        nprobe = min(nprobe, self.nlist)
+        probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self.rows[self.offsets[l]:self.offsets[l + 1]] for l in probed])
+
+    def search(self, row, k, nprobe=None):
+        """Approximate top-``k`` (positions, scores) for catalog ``row``, self excluded."""
+        query = self.matrix[row]
+        candidates = self.candidates(query, nprobe or self.nprobe)
+        candidates = candidates[candidates != row]
+        k = min(k, candidates.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        scores = self.matrix[candidates] @ query.toarray().ravel()
+
+        # Rank in ascending row order so ties break the same way as the exact table
+        order = np.argsort(candidates, kind='stable')
+        top, top_scores = select_top_k(scores[order][np.newaxis], k)
+        return candidates[order][top[0]], top_scores[0]
+
+    def save(self, path=ANN_PATH):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, centroids=self.centroids, offsets=self.offsets, rows=self.rows,
+                 version=np.array(self.version or ''), nprobe=np.array(self.nprobe))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=ANN_PATH, matrix=None):
+        with np.load(path) as data:
+            return cls(data['centroids'], data['offsets'], data['rows'], matrix,
+                       str(data['version']) or None, int(data['nprobe']))
+
+
+def exact_top_k(matrix, rows, k):
+    """Brute-force top-``k`` of ``rows`` for recall measurements."""
+    scores = (matrix[rows] @ matrix.T).toarray()
+    scores[np.arange(len(rows)), rows] = -np.inf
+    return select_top_k(scores, k)[0]
+
+
+def evaluate(index, k, nprobes, queries, seed=0):
+    """recall@k and per-query latency for every ``nprobe``, against exact cosine top-k."""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), min(queries, len(index)), replace=False)
+
+    exact_ms = []
+    truth = []
+    for row in rows:
+        start = time.perf_counter()
+        truth.append(exact_top_k(index.matrix, np.array([row]), k)[0])
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+    results = []
+    for nprobe in nprobes:
+        hits, timings = 0, []
+        for row, expected in zip(rows, truth):
+            start = time.perf_counter()
+            found, _ = index.search(row, k, nprobe)
+            timings.append((time.perf_counter() - start) * 1000)
+            hits += np.intersect1d(found, expected).size
+        results.append((nprobe, hits / (len(rows) * k), statistics.median(timings)))
+    return statistics.median(exact_ms), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--features', default=FEATURES_PATH)
+    parser.add_argument('--index', default=ANN_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='cluster the feature vectors into inverted lists')
+    build_parser.add_argument('--nlist', type=int, help='number of lists, default 4 * sqrt(N)')
+    build_parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE, help='lists searched per query at serve time')
+    build_parser.add_argument('--iterations', type=int, default=KMEANS_ITERATIONS)
+
+    evaluate_parser = commands.add_parser('evaluate', help='recall@k and latency against exact similarity')
+    evaluate_parser.add_argument('--k', type=int, default=25)
+    evaluate_parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    evaluate_parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    features = FeatureStore.load(args.features)
+    if args.command == 'build':
+        start = time.perf_counter()
+        index = IVFIndex.build(features.matrix, args.nlist, args.iterations, nprobe=args.nprobe)
+        index.version = artifact_version(args.features)
+        index.save(args.index)
+        sizes = np.diff(index.offsets)
+        print(f"clustered {len(index)} movies into {index.nlist} lists in {time.perf_counter() - start:.2f}s "
+              f"(list size median {int(np.median(sizes))}, max {sizes.max()}), serving nprobe={index.nprobe}")
+        return 0
+
+    index = IVFIndex.load(args.index, features.matrix)
+    exact_ms, results = evaluate(index, args.k, args.nprobe, args.queries)
+    print(f"{len(index)} movies, {index.nlist} lists, recall@{args.k} over {min(args.queries, len(index))} queries")
+    print(f"  exact        p50 {exact_ms:.2f}ms")
+    for nprobe, recall, latency in results:
+        print(f"  nprobe={nprobe:<4} p50 {latency:.2f}ms  recall {recall:.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# engine/api.py
+"""JSON recommendation API over the same engine the Streamlit app uses.
+
+One aiohttp process serves every request on its event loop. The catalog,
+similarity sources and TMDB caches are loaded once per process, and
+responses carry Cache-Control and ETag headers so clients and proxies can
+revalidate with If-None-Match instead of downloading again.
+
+    python -m engine.api --port 8080
+
+    GET /similar?title=Avatar&n=10&genre=Action&min_rating=6&diversity=0.3
+    GET /emotion?emotion=Happiness&genre=Drama&limit=15
+    GET /watchlist                                   (signed in)
+    GET /watchlist/recommendations?n=10&pooling=sum  (signed in)
+    GET /movies/{movie_id}
+    GET /posters/{movie_id}?width=185
+    GET /metrics
+
+The watchlist endpoints answer for the signed-in user only: send the id of
+a live login session (the app's remember-me session) as
+``Authorization: Bearer <session id>`` or in the app's session cookie.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from engine.metadata import DETAILS_UNAVAILABLE, poster_url
+from engine.posters import PosterStore
+from engine.recommender import Recommender
+from engine.sessions import SESSION_COOKIE, USERS_DB_PATH, SessionStore
+
+# Recommendations only change with the artifacts; details rarely change on TMDB
+RECOMMENDATION_MAX_AGE = 300
+DETAILS_MAX_AGE = 3600
+MAX_RESULTS = 100
+
+ENGINE = web.AppKey('engine', Recommender)
+POSTERS = web.AppKey('posters', PosterStore)
+SESSIONS = web.AppKey('sessions', SessionStore)
+
+
+def json_response(request, payload, max_age=0, status=200):
+    """JSON body with a content-hash ETag; answers 304 when the client already has it."""
+    body = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode()
+    headers = {'Cache-Control': f"public, max-age={max_age}" if max_age else 'no-store'}
+    if status == 200 and max_age:
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        headers['ETag'] = etag
+        if etag in request.headers.get('If-None-Match', ''):
+            return web.Response(status=304, headers=headers)
+    return web.Response(body=body, status=status, content_type='application/json', headers=headers)
+
+
+def error(request, status, message):
+    return json_response(request, {'error': message}, status=status)
+
+
+def int_param(request, name, default, low=1, high=MAX_RESULTS):
+    try:
+        value = int(request.query.get(name, default))
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be an integer")
+    return max(low, min(high, value))
+
+
+def float_param(request, name, default=None):
+    if name not in request.query:
+        return default
+    try:
+        return float(request.query[name])
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be a number")
+
+
+async def user_engine(request):
+    """The engine over the signed-in user's storage; 401 without a live session."""
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        session_id = authorization[len('Bearer '):].strip()
+    else:
+        session_id = request.cookies.get(SESSION_COOKIE)
+    found = None
+    if session_id:
+        # SQLite is blocking, keep it off the event loop
+        found = await asyncio.get_running_loop().run_in_executor(None, request.app[SESSIONS].lookup, session_id)
+    if found is None:
+        raise web.HTTPUnauthorized(text="sign in required", headers={'WWW-Authenticate': 'Bearer'})
+    user_data, _ = found
+    return request.app[ENGINE].for_user(user_data['id'])
+
+
+def movie_json(title, movie_id, details):
+    return {
+        'title': title,
+        'movie_id': movie_id,
+        'poster': poster_url(details.poster),
+        'overview': details.overview,
+        'rating': details.rating,
+        'release_date': details.release_date,
+        'genres': details.genres,
+    }
+
+
+async def similar(request):
+    engine = request.app[ENGINE]
+    title = request.query.get('title')
+    if not title or engine.catalog.position(title) is None:
+        return error(request, 404, f"unknown title: {title!r}")
+
+    diversity = float_param(request, 'diversity', 0.0)
+    if not 0.0 <= diversity < 1.0:
+        return error(request, 400, "diversity must be in [0, 1)")
+
+    result = await engine.recommend_async(
+        title,
+        int_param(request, 'n', 10),
+        genre_filter=request.query.get('genre') or None,
+        rating_filter=float_param(request, 'min_rating'),
+        diversity=diversity,
+        record=False,
+    )
+    movies = [
+        {'title': name, 'movie_id': movie_id, 'poster': poster_url(poster), 'overview': overview,
+         'rating': rating, 'release_date': release_date, 'genres': genres}
+        for name, poster, overview, rating, genres, release_date, movie_id in zip(*result)
+    ]
+    # Placeholders from failed TMDB lookups must not be cached downstream either
+    max_age = 0 if DETAILS_UNAVAILABLE in result.overviews else RECOMMENDATION_MAX_AGE
+    return json_response(request, {'movies': movies, 'version': engine.version}, max_age)
+
+
+async def emotion(request):
+    engine = request.app[ENGINE]
+    # A pandas pass over the whole catalog, keep it off the event loop
+    titles, movie_ids = await asyncio.get_running_loop().run_in_executor(
+        None, engine.by_emotion, request.query.get('emotion'), request.query.get('genre'), int_param(request, 'limit', 15))
+    details_list = await engine.metadata.details_many(movie_ids)
+    movies = [movie_json(*movie) for movie in zip(titles, movie_ids, details_list)]
+    max_age = RECOMMENDATION_MAX_AGE if all(details.available for details in details_list) else 0
+    return json_response(request, {'movies': movies}, max_age)
+
+
+async def watchlist(request):
+    engine = await user_engine(request)
+    # SQLite is blocking, keep it off the event loop
+    rows = await asyncio.get_running_loop().run_in_executor(None, engine.storage.get_watchlist)
+    return json_response(request, {'movies': [{'movie_id': movie_id, 'title': title} for movie_id, title in rows]})
+
+
+async def watchlist_recommendations(request):
+    engine = await user_engine(request)
+    pooling = request.query.get('pooling', 'sum')
+    if pooling not in ('sum', 'max'):
+        return error(request, 400, "pooling must be 'sum' or 'max'")
+
+    loop = asyncio.get_running_loop()
+    positions, scores = await loop.run_in_executor(None, engine.from_watchlist, int_param(request, 'n', 10), pooling)
+    movie_ids = [engine.catalog.movie_id(position) for position in positions]
+    details_list = await engine.metadata.details_many(movie_ids)
+    movies = [dict(movie_json(engine.catalog.title(position), movie_id, details), score=score)
+              for position, movie_id, details, score in zip(positions, movie_ids, details_list, scores)]
+    # Depends on the user's watchlist, never shared by caches
+    return json_response(request, {'movies': movies})
+
+
+async def movie_details(request):
+    engine = request.app[ENGINE]
+    try:
+        movie_id = int(request.match_info['movie_id'])
+    except ValueError:
+        return error(request, 400, "movie_id must be an integer")
+    if len(engine.catalog.positions([movie_id])) == 0:
+        return error(request, 404, f"unknown movie_id: {movie_id}")
+
+    details = (await engine.metadata.details_many([movie_id]))[0]
+    if not details.available:
+        return error(request, 503, details.overview)
+    return json_response(request, dict(details._asdict(), movie_id=movie_id, poster=poster_url(details.poster)),
+                         DETAILS_MAX_AGE)
+
+
+async def poster(request):
+    engine = request.app[ENGINE]
+    try:
+        movie_id = int(request.match_info['movie_id'])
+    except ValueError:
+        return error(request, 400, "movie_id must be an integer")
+    if len(engine.catalog.positions([movie_id])) == 0:
+        return error(request, 404, f"unknown movie_id: {movie_id}")
+
+    details = (await engine.metadata.details_many([movie_id]))[0]
+    if not details.available:
+        return error(request, 503, details.overview)
+    width = int_param(request, 'width', 185, high=780)
+    path = (await request.app[POSTERS].ensure_many([poster_url(details.poster, width)], width))[0]
+    if path is None:
+        return error(request, 503, "poster temporarily unavailable")
+    # Served from disk; FileResponse answers If-None-Match / If-Modified-Since itself
+    return web.FileResponse(path, headers={'Cache-Control': f"public, max-age={DETAILS_MAX_AGE}"})
+
+
+async def metrics(request):
+    engine = request.app[ENGINE]
+    return json_response(request, {
+        'version': engine.version,
+        'catalog_size': len(engine.catalog),
+        'recommendation_cache': engine.cache.stats(),
+        'details_cache': engine.metadata.details_cache.stats(),
+        'poster_cache': engine.metadata.poster_cache.stats(),
+        'poster_files': len(request.app[POSTERS]),
+        'poster_bytes': request.app[POSTERS].size_bytes,
+    })
+
+
+async def open_sessions(app):
+    await app[ENGINE].metadata.open()
+    await app[POSTERS].open()
+
+
+async def close_sessions(app):
+    await app[ENGINE].metadata.close()
+    await app[POSTERS].close()
+
+
+def create_app(engine, posters=None, sessions=None):
+    app = web.Application()
+    app[ENGINE] = engine
+    app[POSTERS] = posters if posters is not None else PosterStore()
+    app[SESSIONS] = sessions if sessions is not None else SessionStore()
+    # The API may start against a users database the app has never opened
+    app[SESSIONS].init()
+    app.router.add_get('/similar', similar)
+    app.router.add_get('/emotion', emotion)
+    app.router.add_get('/watchlist', watchlist)
+    app.router.add_get('/watchlist/recommendations', watchlist_recommendations)
+    app.router.add_get('/movies/{movie_id}', movie_details)
+    app.router.add_get('/posters/{movie_id}', poster)
+    app.router.add_get('/metrics', metrics)
+    # One TMDB and one image session for the server's lifetime, so connections stay alive between requests
+    app.on_startup.append(open_sessions)
+    app.on_cleanup.append(close_sessions)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--users-db', default=USERS_DB_PATH, help="the app's users database, for sign-in sessions")
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = Recommender.load(os.getenv('API_KEY'))
+    web.run_app(create_app(engine, sessions=SessionStore(args.users_db)), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# engine/catalog.py
+import pickle
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from engine.title_search import TitleIndex
+
+MOVIES_PATH = 'data/movie_dict.pkl'
+
+
+def load_emotions():
+    from data.emo import movies_data
+    moviesemo = pd.DataFrame(movies_data)
+    moviesemo['emotions'] = moviesemo['emotions'].apply(lambda x: eval(x) if isinstance(x, str) else x)
+    moviesemo['genres'] = moviesemo['genres'].apply(lambda x: eval(x) if isinstance(x, str) else x)
+    return moviesemo
+
+
+class Catalog:
+    """The movie table plus lookups between titles, movie IDs and positions.
+
+    Positions are row numbers, the same rows the similarity matrix and
+    neighbour table use; the DataFrame index itself has gaps.
+    """
+
+    def __init__(self, movies, emotions=None):
+        self.movies = movies
+        self.emotions = emotions
+        self.titles = movies['title'].tolist()
+        self.movie_ids = movies['movie_id'].to_numpy()
+        self._positions = {}
+        for position, title in enumerate(self.titles):
+            self._positions.setdefault(title, position)
+
+    @classmethod
+    def load(cls, movies_path=MOVIES_PATH, with_emotions=True):
+        with open(movies_path, 'rb') as f:
+            movies = pd.DataFrame(pickle.load(f))
+        return cls(movies, load_emotions() if with_emotions else None)
+
+    def __len__(self):
+        return len(self.titles)
+
+    @cached_property
+    def title_index(self):
+        return TitleIndex(self.titles)
+
+    def position(self, title):
+        """Row of the first movie called ``title``, or None."""
+        return self._positions.get(title)
+
+    def positions(self, movie_ids):
+        """Rows of the given movie IDs, e.g. the watchlist, in one vectorized lookup."""
+        return np.flatnonzero(np.isin(self.movie_ids, list(movie_ids)))
+
+    def title(self, position):
+        return self.titles[position]
+
+    def movie_id(self, position):
+        return int(self.movie_ids[position])
+
+    def emotion_matches(self, emotion, genre, limit=15):
+        """(titles, movie_ids) tagged with ``emotion`` or ``genre`` that are in the catalog."""
+        emotions = self.emotions
+        matches = emotions[
+            emotions['emotions'].apply(lambda tags: emotion in tags) |
+            emotions['genres'].apply(lambda genres: genre in genres)
+        ].head(limit)
+
+        titles, movie_ids = [], []
+        for title in matches['title'].drop_duplicates():
+            position = self.position(title)
+            if position is not None:
+                titles.append(title)
+                movie_ids.append(self.movie_id(position))
+        return titles, movie_ids
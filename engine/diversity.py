@@ -0,0 +1,48 @@
+# engine/diversity.py
+import numpy as np
+
+from engine.neighbors import top_k_rows
+
+MMR_POOL_SIZE = 500
+
+
+def mmr_rerank(relevance, pairwise, k, lam=0.7):
+    """Maximal marginal relevance order over a candidate pool.
+
+    ``relevance[i]`` is candidate i's similarity to the query and
+    ``pairwise[i, j]`` the similarity between candidates. Each step picks
+    ``argmax(lam * relevance - (1 - lam) * max similarity to already picked)``;
+    the running max is one vectorized ``np.maximum`` per step, so the whole
+    re-rank is O(k * pool) in NumPy with no per-item Python loop.
+    Returns positions into the pool, best first. ``lam=1`` is plain relevance.
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    pool_size = relevance.shape[0]
+    k = min(k, pool_size)
+
+    selected = np.empty(k, dtype=np.int64)
+    redundancy = np.zeros(pool_size, dtype=np.float64)
+    taken = np.zeros(pool_size, dtype=bool)
+    for step in range(k):
+        score = lam * relevance - (1.0 - lam) * redundancy
+        score[taken] = -np.inf
+        best = int(np.argmax(score))
+        selected[step] = best
+        taken[best] = True
+        np.maximum(redundancy, pairwise[best], out=redundancy)
+    return selected
+
+
+def diverse_top_k(similarity, row, k, lam=0.7, pool_size=MMR_POOL_SIZE, pool=None):
+    """Top-``k`` catalog positions for ``row`` re-ranked by MMR.
+
+    The pool defaults to the ``pool_size`` most similar rows; pass ``pool``
+    (catalog positions, best first) to re-rank an existing candidate list.
+    """
+    if pool is None:
+        pool, _ = top_k_rows(similarity[row:row + 1], row, pool_size)
+        pool = pool[0]
+    pool = np.asarray(pool)
+    relevance = similarity[row, pool]
+    pairwise = similarity[np.ix_(pool, pool)]
+    return pool[mmr_rerank(relevance, pairwise, k, lam)]
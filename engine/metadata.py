@@ -0,0 +1,195 @@
+# engine/metadata.py
+import asyncio
+import contextlib
+from typing import NamedTuple
+
+import aiohttp
+
+from engine.result_cache import DETAILS_CACHE_SIZE, LRUCache
+
+TMDB_MOVIE_URL = "https://api.themoviedb.org/3/movie/{movie_id}"
+TMDB_IMAGE_URL = "https://image.tmdb.org/t/p/{size}{poster_path}"
+# Poster widths TMDB serves; "original" is left out, it can be several MB
+POSTER_SIZES = (92, 154, 185, 342, 500, 780)
+POSTER_PLACEHOLDER = "https://res.cloudinary.com/dh5cebjwj/image/upload/v1758476649/download_idywpr.png"
+ERROR_POSTER = "https://via.placeholder.com/200x300?text=Error+Loading"
+DETAILS_UNAVAILABLE = "Details temporarily unavailable"
+POSTER_CACHE_SIZE = 20000
+REQUEST_TIMEOUT = 10
+
+
+class MovieDetails(NamedTuple):
+    """TMDB fields the app shows; still unpacks like the 13-tuple it replaced.
+
+    ``poster`` is TMDB's bare ``poster_path`` (or a placeholder URL); each
+    view turns it into a URL of the size it draws with ``poster_url``.
+    """
+    poster: str
+    overview: str
+    rating: float
+    release_date: str
+    genres: list
+    budget: int
+    revenue: int
+    runtime: int
+    spoken_languages: list
+    tagline: str
+    production_companies: list
+    imdb_id: str
+    homepage: str
+
+    @property
+    def available(self):
+        return self.overview != DETAILS_UNAVAILABLE
+
+
+UNAVAILABLE_DETAILS = MovieDetails(
+    POSTER_PLACEHOLDER, DETAILS_UNAVAILABLE, 0.0, "2000-01-01", ["Unknown"],
+    0, 0, 0, ["Unknown"], "No tagline available", ["Unknown"], "", ""
+)
+
+
+def poster_size(width):
+    """Smallest TMDB size name (``w185``...) at least ``width`` pixels wide."""
+    for size in POSTER_SIZES:
+        if size >= width:
+            return f"w{size}"
+    return f"w{POSTER_SIZES[-1]}"
+
+
+def poster_url(poster, width=POSTER_SIZES[-1]):
+    """Image URL for a cached poster drawn ``width`` pixels wide; placeholders pass through."""
+    if not poster or poster.startswith(('http://', 'https://')):
+        return poster
+    return TMDB_IMAGE_URL.format(size=poster_size(width), poster_path=poster)
+
+
+def parse_details(data):
+    return MovieDetails(
+        data.get('poster_path') or POSTER_PLACEHOLDER,
+        data.get('overview', 'No overview available'),
+        data.get('vote_average', 0.0),
+        data.get('release_date', 'Unknown'),
+        [genre['name'] for genre in data.get('genres', [])],
+        data.get('budget', 0),
+        data.get('revenue', 0),
+        data.get('runtime', 0),
+        [lang['name'] for lang in data.get('spoken_languages', [])],
+        data.get('tagline', 'No tagline available'),
+        [comp['name'] for comp in data.get('production_companies', [])],
+        data.get('imdb_id', ''),
+        data.get('homepage', ''),
+    )
+
+
+class KeptSession:
+    """An aiohttp session kept open on one event loop across batches.
+
+    A long-running loop (a server's) ``open``s it once, so its batches share
+    one connection pool and keep-alive connections. Batches on any other
+    loop, such as the one a Streamlit rerun runs and closes, get a session
+    of their own for the batch.
+    """
+
+    def __init__(self):
+        self.session = None
+        self.loop = None
+
+    async def open(self):
+        if self.session is None:
+            self.loop = asyncio.get_running_loop()
+            self.session = aiohttp.ClientSession()
+
+    async def close(self):
+        if self.session is not None:
+            session, self.session, self.loop = self.session, None, None
+            await session.close()
+
+    @contextlib.asynccontextmanager
+    async def batch(self):
+        if self.session is not None and self.loop is asyncio.get_running_loop():
+            yield self.session
+        else:
+            async with aiohttp.ClientSession() as session:
+                yield session
+
+
+class MetadataClient:
+    """TMDB lookups behind process-wide, thread-safe caches.
+
+    Every coroutine takes the aiohttp session explicitly (or a batch gets
+    one from ``sessions``), so the client can be used from any event loop: a
+    Streamlit rerun, the background prefetch loop or a server, which keeps
+    one session open between ``open`` and ``close``. Failed lookups are
+    returned as placeholders but never cached, so the next request retries
+    them.
+    """
+
+    def __init__(self, api_key, details_cache=None, poster_cache=None, timeout=REQUEST_TIMEOUT):
+        self.api_key = api_key
+        self.details_cache = details_cache if details_cache is not None else LRUCache(DETAILS_CACHE_SIZE)
+        self.poster_cache = poster_cache if poster_cache is not None else LRUCache(POSTER_CACHE_SIZE)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.sessions = KeptSession()
+
+    async def open(self):
+        """Keep one TMDB session on the running loop until ``close``."""
+        await self.sessions.open()
+
+    async def close(self):
+        await self.sessions.close()
+
+    async def _get_movie(self, movie_id, session):
+        url = TMDB_MOVIE_URL.format(movie_id=movie_id)
+        async with session.get(url, params={'api_key': self.api_key}, timeout=self.timeout) as response:
+            if response.status != 200:
+                raise Exception(f"HTTP error: {response.status}")
+            return await response.json()
+
+    async def details(self, movie_id, session):
+        cached = self.details_cache.get(movie_id)
+        if cached is not None:
+            return cached
+        try:
+            result = parse_details(await self._get_movie(movie_id, session))
+        except Exception:
+            return UNAVAILABLE_DETAILS
+        self.details_cache.put(movie_id, result)
+        # The details response carries the poster too, no need to ask again
+        self.poster_cache.put(movie_id, result.poster)
+        return result
+
+    async def details_many(self, movie_ids):
+        async with self.sessions.batch() as session:
+            return await asyncio.gather(*[self.details(movie_id, session) for movie_id in movie_ids])
+
+    async def iter_details(self, movie_ids):
+        """Yield ``(position, details)`` in completion order instead of waiting for all."""
+        async with self.sessions.batch() as session:
+            async def fetch(position, movie_id):
+                return position, await self.details(movie_id, session)
+
+            for next_done in asyncio.as_completed([fetch(i, movie_id) for i, movie_id in enumerate(movie_ids)]):
+                yield await next_done
+
+    def has_details(self, movie_id):
+        return movie_id in self.details_cache
+
+    def has_poster(self, movie_id):
+        return movie_id in self.poster_cache
+
+    async def poster(self, movie_id, session):
+        cached = self.poster_cache.get(movie_id)
+        if cached is not None:
+            return cached
+        try:
+            data = await self._get_movie(movie_id, session)
+        except Exception:
+            return ERROR_POSTER
+        poster = data.get('poster_path') or POSTER_PLACEHOLDER
+        self.poster_cache.put(movie_id, poster)
+        return poster
+
+    async def posters(self, movie_ids):
+        async with self.sessions.batch() as session:
+            return await asyncio.gather(*[self.poster(movie_id, session) for movie_id in movie_ids])
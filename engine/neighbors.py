@@ -0,0 +1,114 @@
+# engine/neighbors.py
+import os
+
+import numpy as np
+
+NEIGHBORS_PATH = 'data/neighbors.npz'
+
+
+def select_top_k(values, k):
+    """Sorted top-``k`` of every row of a 2-D array, ties broken by lower column.
+
+    ``np.partition`` finds each row's k-th best value in O(N); everything above
+    it is kept, and boundary ties are filled in column order, so the result is
+    deterministic no matter how the rows were blocked. Returns
+    ``(indices int32, scores float32)`` of shape ``(len(values), k)``.
+    """
+    n = values.shape[1]
+    kth = np.partition(values, n - k, axis=1)[:, n - k:n - k + 1]
+    selected = values >= kth
+
+    # Only rows with more boundary ties than slots need the column-order fill
+    crowded = np.flatnonzero(selected.sum(axis=1) > k)
+    if crowded.size:
+        rows = values[crowded]
+        ties = rows == kth[crowded]
+        needed = k - (rows > kth[crowded]).sum(axis=1, keepdims=True)
+        selected[crowded] = (rows > kth[crowded]) | (ties & (np.cumsum(ties, axis=1) <= needed))
+
+    # nonzero() walks row-major, so every row contributes exactly k columns
+    candidates = np.nonzero(selected)[1].reshape(values.shape[0], k)
+    candidate_scores = np.take_along_axis(values, candidates, axis=1)
+    order = np.lexsort((candidates, -candidate_scores), axis=1)
+    indices = np.take_along_axis(candidates, order, axis=1).astype(np.int32)
+    scores = np.take_along_axis(candidate_scores, order, axis=1).astype(np.float32)
+    return indices, scores
+
+
+def top_k_rows(block, row_offset, k):
+    """Top-``k`` columns of every row in ``block``, best first, skipping self.
+
+    ``block`` holds rows ``row_offset .. row_offset + len(block)`` of a square
+    similarity matrix.
+    """
+    block = np.array(block, dtype=np.promote_types(block.dtype, np.float32), copy=True, order='C')
+    rows = np.arange(block.shape[0])
+    columns = rows + row_offset
+    in_range = columns < block.shape[1]
+    block[rows[in_range], columns[in_range]] = -np.inf
+    return select_top_k(block, min(k, block.shape[1] - 1))
+
+
+class NeighborTable:
+    """Precomputed top-K neighbours for every catalog row.
+
+    Serving a recommendation is a single slice of ``indices``; ``version``
+    records which catalog/similarity artifacts the table was built from.
+    """
+
+    def __init__(self, indices, scores, version=None):
+        self.indices = indices
+        self.scores = scores
+        self.version = version
+
+    @property
+    def k(self):
+        return self.indices.shape[1]
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+    def neighbors(self, row, n):
+        return self.indices[row, :n]
+
+    def save(self, path=NEIGHBORS_PATH):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, indices=self.indices, scores=self.scores, version=np.array(self.version or ''))
+        # Atomic swap so a running app never reads a half-written table
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=NEIGHBORS_PATH):
+        with np.load(path) as data:
+            return cls(data['indices'], data['scores'], str(data['version']) or None)
+
+
+def pooled_top_k(scores, exclude, k):
+    """Best ``k`` positions of a pooled score vector, never returning ``exclude``."""
+    scores = np.array(scores, dtype=np.promote_types(scores.dtype, np.float32), copy=True)
+    scores[exclude] = -np.inf
+    k = min(k, scores.shape[0] - len(np.unique(exclude)))
+    if k <= 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+    indices, best_scores = select_top_k(scores[np.newaxis], k)
+    return indices[0], best_scores[0]
+
+
+def pool_dense(similarity, seeds, pooling='sum'):
+    """Aggregate the similarity rows of all seeds in one vectorized reduction."""
+    rows = similarity[np.unique(seeds)]
+    return rows.max(axis=0) if pooling == 'max' else rows.sum(axis=0, dtype=np.float64)
+
+
+def pool_table(table, seeds, pooling='sum'):
+    """Same as pool_dense but from a NeighborTable, scattering each seed's top-K."""
+    seeds = np.unique(seeds)
+    pooled = np.zeros(len(table), dtype=np.float64)
+    columns = table.indices[seeds].ravel()
+    values = table.scores[seeds].ravel()
+    if pooling == 'max':
+        np.maximum.at(pooled, columns, values)
+    else:
+        np.add.at(pooled, columns, values)
+    return pooled
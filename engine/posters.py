@@ -0,0 +1,263 @@
+# engine/posters.py
+import asyncio
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import aiohttp
+from PIL import Image
+
+from engine.metadata import POSTER_SIZES, KeptSession
+from engine.storage import DB_TIMEOUT
+
+POSTER_DIR = os.getenv('POSTER_DIR', 'data/posters')
+# Widths a view can ask for; each request is served by the smallest one at least as wide.
+# Same ladder as TMDB, so a thumbnail is usually the downloaded image re-encoded as is
+THUMBNAIL_WIDTHS = POSTER_SIZES
+THUMBNAIL_QUALITY = 82
+DOWNLOAD_TIMEOUT = 15
+# Disk budget for originals and thumbnails together; least recently used images go first
+POSTER_CACHE_MB = int(os.getenv('POSTER_CACHE_MB', '512'))
+# Eviction frees down to this fraction of the budget, so it does not run on every download
+EVICT_TO = 0.9
+
+
+class PosterStore:
+    """Poster images downloaded once and served from disk as thumbnails.
+
+    Originals are stored under their content hash, so identical images (the
+    placeholder every poster-less movie shares) are stored once and a file
+    name never changes meaning. Thumbnails are generated lazily, one JPEG
+    per (image, width), next to them:
+
+        data/posters/original/<digest>
+        data/posters/w185/<digest>.jpg
+        data/posters/index.db          urls (url -> digest), images (digest -> bytes, last use)
+
+    The index is SQLite, so a new poster is one row insert, and it is also
+    held in memory for ``thumbnail``, which only looks at memory and the
+    disk and never blocks. ``ensure`` and ``ensure_many`` download and
+    resize whatever is missing. Once the files pass ``max_bytes`` the least
+    recently used images are deleted, original and thumbnails together.
+    """
+
+    def __init__(self, root=POSTER_DIR, widths=THUMBNAIL_WIDTHS, timeout=DOWNLOAD_TIMEOUT,
+                 max_bytes=POSTER_CACHE_MB * 2 ** 20):
+        self.root = root
+        self.widths = tuple(sorted(widths))
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.sessions = KeptSession()
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, 'index.db')
+        self._lock = threading.Lock()
+        self._inflight = {}
+        # digest -> last time a view used it, written to the index when evicting
+        self._touched = {}
+
+        os.makedirs(root, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_urls_digest ON urls (digest)")
+            conn.execute("CREATE TABLE IF NOT EXISTS images "
+                         "(digest TEXT PRIMARY KEY, bytes INTEGER NOT NULL DEFAULT 0, last_used REAL NOT NULL)")
+        self._import_json_index(conn)
+        self._index = dict(conn.execute("SELECT url, digest FROM urls").fetchall())
+        self._bytes = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM images").fetchone()[0]
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=DB_TIMEOUT)
+
+    def _import_json_index(self, conn):
+        # Stores written before the SQLite index kept {url: digest} in index.json
+        json_path = os.path.join(self.root, 'index.json')
+        try:
+            with open(json_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        images = []
+        for digest in set(index.values()):
+            paths = [self.original_path(digest)] + [self.thumbnail_path(digest, width) for width in self.widths]
+            sizes = [os.path.getsize(path) for path in paths if os.path.exists(path)]
+            last_used = os.path.getmtime(paths[0]) if os.path.exists(paths[0]) else time.time()
+            images.append((digest, sum(sizes), last_used))
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO urls (url, digest) VALUES (?, ?)", index.items())
+            conn.executemany("INSERT OR REPLACE INTO images (digest, bytes, last_used) VALUES (?, ?, ?)", images)
+        os.remove(json_path)
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def variant(self, width):
+        """Smallest stored width that still fills ``width`` pixels."""
+        for candidate in self.widths:
+            if candidate >= width:
+                return candidate
+        return self.widths[-1]
+
+    def digest(self, url):
+        with self._lock:
+            return self._index.get(url)
+
+    def original_path(self, digest):
+        return os.path.join(self.root, 'original', digest)
+
+    def thumbnail_path(self, digest, width):
+        return os.path.join(self.root, f"w{width}", f"{digest}.jpg")
+
+    def thumbnail(self, url, width):
+        """Local thumbnail for ``url`` at ``width`` if it is already on disk, else None."""
+        with self._lock:
+            digest = self._index.get(url)
+            if digest is None:
+                return None
+            self._touched[digest] = time.time()
+        path = self.thumbnail_path(digest, self.variant(width))
+        return path if os.path.exists(path) else None
+
+    def _write(self, path, data):
+        # Write-then-rename so a concurrent reader never sees half an image
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remember(self, url, digest, added_bytes=0):
+        """Record ``url`` -> ``digest``: one row, not a rewrite of the whole index."""
+        with self._lock:
+            self._index[url] = digest
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO urls (url, digest) VALUES (?, ?)", (url, digest))
+            conn.execute("INSERT INTO images (digest, bytes, last_used) VALUES (?, 0, ?) "
+                         "ON CONFLICT (digest) DO UPDATE SET last_used = excluded.last_used", (digest, time.time()))
+        conn.close()
+        self._account(digest, added_bytes)
+
+    def _account(self, digest, added_bytes):
+        if not added_bytes:
+            return
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE images SET bytes = bytes + ?, last_used = ? WHERE digest = ?",
+                         (added_bytes, time.time(), digest))
+        conn.close()
+        with self._lock:
+            self._bytes += added_bytes
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used images until the files fit in ``EVICT_TO`` of ``max_bytes``."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        conn = self._connect()
+        with conn:
+            conn.executemany("UPDATE images SET last_used = MAX(last_used, ?) WHERE digest = ?",
+                             [(used, digest) for digest, used in touched.items()])
+            # Recounted from the index: other processes (the API, another app) share the directory
+            total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM images").fetchone()[0]
+            victims = []
+            for digest, size in conn.execute("SELECT digest, bytes FROM images ORDER BY last_used").fetchall():
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                victims.append(digest)
+                total -= size
+            conn.executemany("DELETE FROM urls WHERE digest = ?", [(digest,) for digest in victims])
+            conn.executemany("DELETE FROM images WHERE digest = ?", [(digest,) for digest in victims])
+        conn.close()
+
+        evicted = set(victims)
+        with self._lock:
+            self._index = {url: digest for url, digest in self._index.items() if digest not in evicted}
+            self._bytes = total
+        for digest in victims:
+            for path in [self.original_path(digest)] + [self.thumbnail_path(digest, width) for width in self.widths]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return len(victims)
+
+    def _resize(self, digest, width):
+        path = self.thumbnail_path(digest, width)
+        if os.path.exists(path):
+            return path
+        with Image.open(self.original_path(digest)) as image:
+            image = image.convert('RGB')
+            if image.width > width:
+                image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+        self._write(path, buffer.getvalue())
+        self._account(digest, buffer.tell())
+        return path
+
+    async def _download(self, url, session):
+        digest = self.digest(url)
+        if digest is not None and os.path.exists(self.original_path(digest)):
+            return digest
+        async with session.get(url, timeout=self.timeout) as response:
+            if response.status != 200:
+                raise Exception(f"HTTP error: {response.status}")
+            data = await response.read()
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        path = self.original_path(digest)
+        added_bytes = 0
+        if not os.path.exists(path):
+            self._write(path, data)
+            added_bytes = len(data)
+        self._remember(url, digest, added_bytes)
+        return digest
+
+    async def _ensure(self, url, width, session):
+        digest = await self._download(url, session)
+        # Pillow decoding is CPU-bound, keep it off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self._resize, digest, width)
+
+    async def ensure(self, url, width, session):
+        """Path of the ``width`` thumbnail for ``url``, downloading and resizing if needed.
+
+        Returns None when the image cannot be fetched or decoded; nothing is
+        remembered for it, so the next call retries.
+        """
+        width = self.variant(width)
+        path = self.thumbnail(url, width)
+        if path is not None:
+            return path
+
+        # Cards, prefetches and API clients often ask for the same poster at once
+        key = (asyncio.get_running_loop(), url, width)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._ensure(url, width, session))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            return None
+
+    async def open(self):
+        """Keep one image session on the running loop until ``close``."""
+        await self.sessions.open()
+
+    async def close(self):
+        await self.sessions.close()
+
+    async def ensure_many(self, urls, width):
+        async with self.sessions.batch() as session:
+            return await asyncio.gather(*[self.ensure(url, width, session) for url in urls])
@@ -0,0 +1,86 @@
+# engine/precompute.py
+"""Nightly batch job: top-K recommendations for every catalog movie.
+
+Reads the dense similarity matrix, splits it into row blocks and ranks them
+on a process pool. The result is a NeighborTable that recommend() serves
+with one array slice.
+
+    python -m engine.precompute --k 50 --workers 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine.neighbors import NEIGHBORS_PATH, NeighborTable, top_k_rows
+from engine.result_cache import artifact_version
+from engine.similarity_store import load_similarity
+
+# Set in each worker by _init_worker, so the matrix is opened once per process
+_worker_similarity = None
+_worker_k = None
+
+
+def _init_worker(npy_path, k):
+    global _worker_similarity, _worker_k
+    # Memory-mapped: every worker shares the page cache instead of a private copy
+    _worker_similarity = np.load(npy_path, mmap_mode='r')
+    _worker_k = k
+
+
+def _rank_block(bounds):
+    start, stop = bounds
+    indices, scores = top_k_rows(_worker_similarity[start:stop], start, _worker_k)
+    return start, indices, scores
+
+
+def precompute_neighbors(similarity, k=50, workers=None, block_rows=256):
+    """Rank every row of ``similarity`` on ``workers`` processes."""
+    n = similarity.shape[0]
+    workers = workers or os.cpu_count() or 1
+    k = min(k, n - 1)
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    blocks = [(start, min(start + block_rows, n)) for start in range(0, n, block_rows)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        npy_path = os.path.join(tmp_dir, 'similarity.npy')
+        np.save(npy_path, np.ascontiguousarray(similarity))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(npy_path, k)) as pool:
+            for start, block_indices, block_scores in pool.map(_rank_block, blocks):
+                indices[start:start + len(block_indices)] = block_indices
+                scores[start:start + len(block_scores)] = block_scores
+
+    return indices, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--movies', default='data/movie_dict.pkl')
+    parser.add_argument('--similarity', default='data/similarity.pkl')
+    parser.add_argument('--output', default=NEIGHBORS_PATH)
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--block-rows', type=int, default=256)
+    args = parser.parse_args()
+
+    version = artifact_version(args.movies, args.similarity)
+    # Reduced-precision matrices are ranked dequantized
+    similarity = np.asarray(load_similarity(args.similarity)[:])
+
+    start = time.perf_counter()
+    indices, scores = precompute_neighbors(similarity, args.k, args.workers, args.block_rows)
+    elapsed = time.perf_counter() - start
+
+    NeighborTable(indices, scores, version).save(args.output)
+    rows = similarity.shape[0]
+    print(f"ranked {rows} rows (k={indices.shape[1]}) on {args.workers} workers "
+          f"in {elapsed:.2f}s: {rows / elapsed:,.0f} rows/s, {rows / elapsed / args.workers:,.0f} rows/s/worker")
+    print(f"wrote {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB, catalog version {version})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# engine/recommender.py
+import asyncio
+import random
+from typing import NamedTuple
+
+from engine.ann import ANN_PATH
+from engine.catalog import MOVIES_PATH, Catalog
+from engine.metadata import MetadataClient
+from engine.neighbors import NEIGHBORS_PATH
+from engine.result_cache import RECOMMENDATION_CACHE_SIZE, LRUCache, artifact_version
+from engine.similarity import SIMILARITY_PATH, SimilarityIndex
+from engine.similarity_build import FEATURES_PATH
+from engine.storage import Storage
+
+
+
+class Recommendations(NamedTuple):
+    """Parallel lists, one entry per recommended movie that passed the filters."""
+    titles: list
+    posters: list
+    overviews: list
+    ratings: list
+    genres: list
+    release_dates: list
+    movie_ids: list
+
+
+def passes_filters(details, genre_filter=None, rating_filter=None):
+    # Apply genre filter if specified
+    if genre_filter and genre_filter not in details.genres:
+        return False
+
+    # Apply rating filter if specified
+    if rating_filter and details.rating < rating_filter:
+        return False
+
+    return True
+
+
+def catalog_version(movies_path=MOVIES_PATH, similarity_path=SIMILARITY_PATH, neighbors_path=NEIGHBORS_PATH,
+                    features_path=FEATURES_PATH, ann_path=ANN_PATH):
+    """Fingerprint of the artifacts recommendations are served from, changes when any file does."""
+    return artifact_version(movies_path, similarity_path, neighbors_path, features_path, ann_path)
+
+
+class Recommender:
+    """Content-based recommendations over injected catalog, similarity, metadata and storage.
+
+    Nothing here knows about Streamlit; sync methods are for scripts and
+    batch jobs, the ``*_async`` ones for callers already inside an event loop.
+    Results are shared through ``cache`` (keyed by ``version``) unless the
+    request was randomized or a TMDB lookup failed.
+    """
+
+    def __init__(self, catalog, similarity, metadata, storage, cache=None, version=None):
+        self.catalog = catalog
+        self.similarity = similarity
+        self.metadata = metadata
+        self.storage = storage
+        self.cache = cache if cache is not None else LRUCache(RECOMMENDATION_CACHE_SIZE)
+        self.version = version
+
+    @classmethod
+    def load(cls, api_key, storage=None, cache=None, metadata=None, movies_path=MOVIES_PATH,
+             similarity_path=SIMILARITY_PATH):
+        catalog = Catalog.load(movies_path)
+        similarity = SimilarityIndex.load(len(catalog), movies_path, similarity_path)
+        if storage is None:
+            storage = Storage()
+            storage.init()
+        return cls(catalog, similarity, metadata or MetadataClient(api_key), storage, cache,
+                   catalog_version(movies_path, similarity_path))
+
+    def cache_key(self, movie, num_recommendations, genre_filter=None, rating_filter=None, diversity=0.0):
+        self.cache.ensure_version(self.version)
+        return (movie, num_recommendations, genre_filter, rating_filter, diversity, self.version)
+
+    def cached(self, movie, num_recommendations, genre_filter=None, rating_filter=None, diversity=0.0):
+        return self.cache.get(self.cache_key(movie, num_recommendations, genre_filter, rating_filter, diversity))
+
+    def store(self, key, positions, details_list, genre_filter=None, rating_filter=None):
+        """Cache a result unless it was built from failed TMDB lookups."""
+        result = self.collect(positions, details_list, genre_filter, rating_filter)
+        if all(details.available for details in details_list):
+            self.cache.put(key, result)
+        return result
+
+    def for_user(self, user_id):
+        """The same engine (catalog, similarity, caches) over ``user_id``'s history and watchlist."""
+        return Recommender(self.catalog, self.similarity, self.metadata, self.storage.for_user(user_id),
+                           self.cache, self.version)
+
+    # Cache hits still count as recommendations in the history
+    def record(self, result):
+        self.storage.insert_recommendations(zip(result.titles, result.genres, result.ratings))
+
+    def candidates(self, movie, num_recommendations, randomize=False, diversity=0.0):
+        """Catalog positions to recommend, before any TMDB-dependent filtering.
+
+        Raises LookupError for a title that is not in the catalog.
+        """
+        if randomize:
+            return random.sample(range(len(self.catalog)), min(num_recommendations, len(self.catalog)))
+        position = self.catalog.position(movie)
+        if position is None:
+            raise LookupError(movie)
+        return self.similarity.similar(position, num_recommendations, diversity)
+
+    def collect(self, positions, details_list, genre_filter=None, rating_filter=None):
+        """Filter fetched details and unpack them into Recommendations."""
+        result = Recommendations([], [], [], [], [], [], [])
+        for position, details in zip(positions, details_list):
+            if not passes_filters(details, genre_filter, rating_filter):
+                continue
+            result.titles.append(self.catalog.title(position))
+            result.posters.append(details.poster)
+            result.overviews.append(details.overview)
+            result.ratings.append(details.rating)
+            result.genres.append(details.genres)
+            result.release_dates.append(details.release_date)
+            result.movie_ids.append(self.catalog.movie_id(position))
+        return result
+
+    async def recommend_async(self, movie, num_recommendations, genre_filter=None, randomize=False,
+                              rating_filter=None, diversity=0.0, record=True):
+        """``record=False`` leaves the recommendation history alone (API and batch callers)."""
+        if not randomize:
+            key = self.cache_key(movie, num_recommendations, genre_filter, rating_filter, diversity)
+            cached = self.cache.get(key)
+            if cached is not None:
+                if record:
+                    self.record(cached)
+                return cached
+
+        # Top-K and MMR are CPU-bound; off the event loop, other requests keep being served
+        positions = await asyncio.get_running_loop().run_in_executor(
+            None, self.candidates, movie, num_recommendations, randomize, diversity)
+        details_list = await self.metadata.details_many([self.catalog.movie_id(position) for position in positions])
+
+        if randomize:
+            result = self.collect(positions, details_list, genre_filter, rating_filter)
+        else:
+            result = self.store(key, positions, details_list, genre_filter, rating_filter)
+        if record:
+            self.record(result)
+        return result
+
+    def recommend(self, movie, num_recommendations, genre_filter=None, randomize=False, rating_filter=None, diversity=0.0):
+        return asyncio.run(self.recommend_async(movie, num_recommendations, genre_filter, randomize, rating_filter, diversity))
+
+    def from_seeds(self, seed_positions, k, pooling='sum'):
+        """Top-k (positions, scores) pooled over every seed, for "Because you watched"."""
+        return self.similarity.pooled(seed_positions, k, pooling)
+
+    def from_watchlist(self, k, pooling='sum'):
+        seeds = self.catalog.positions(movie_id for movie_id, _ in self.storage.get_watchlist())
+        return self.from_seeds(seeds, k, pooling)
+
+    def by_emotion(self, emotion, genre, limit=15):
+        return self.catalog.emotion_matches(emotion, genre, limit)
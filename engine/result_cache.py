@@ -0,0 +1,93 @@
+# engine/result_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Sizes of the process-wide caches, here rather than next to their users so
+# the Streamlit pages can size theirs without importing pandas or aiohttp
+RECOMMENDATION_CACHE_SIZE = 512
+DETAILS_CACHE_SIZE = 10000
+
+
+class LRUCache:
+    """Thread-safe, process-wide LRU cache with hit-rate counters.
+
+    Streamlit runs every session's script on its own thread, so all access
+    goes through one lock. Values are shared between sessions and must be
+    treated as read-only by callers.
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def ensure_version(self, version):
+        """Drop every entry when the underlying artifacts changed."""
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._data.clear()
+                self.invalidations += 1
+            self._version = version
+
+    def __contains__(self, key):
+        # Membership test only, not counted as a lookup
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'invalidations': self.invalidations,
+            }
+
+
+def artifact_version(*paths):
+    """Short fingerprint of data files from their size and modification time.
+
+    How a path is spelled is left out, so ``data/x.pkl`` from the app and
+    ``./data/x.pkl`` from a CLI (or the same tree in another directory) get
+    the same version; files are told apart by their position.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            digest.update(b"missing;")
+    return digest.hexdigest()[:12]
@@ -0,0 +1,225 @@
+# engine/retention.py
+"""Retention for the recommendation history.
+
+Each user keeps a rolling window of raw history: rows newer than
+``--days`` and, of those, at most the newest ``--rows``. Anything older is
+downsampled into per-day, per-genre and per-rating rollups (what the
+dashboard charts need), written to gzipped JSON-lines files under
+``--archive-dir`` and deleted. Freed pages are then returned to the
+filesystem a slice at a time with incremental VACUUM.
+
+    python -m engine.retention --days 180 --rows 1000
+
+The Streamlit app runs the same pass periodically on a background thread
+(``Maintenance``). Incremental VACUUM needs ``auto_vacuum = INCREMENTAL``;
+files created before retention existed are converted by one full VACUUM,
+which locks the whole file for as long as it takes, so only the command
+line does that. Until it has been run once, the app's passes still roll up
+and delete history but leave the freed pages in the file for reuse.
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from engine.storage import DB_PATH, DB_TIMEOUT, Storage, now
+
+HISTORY_DAYS = 180
+HISTORY_ROWS = 1000
+ARCHIVE_DIR = 'data/archive'
+# Rows per archive file and delete transaction, so the app's writes never wait long
+BATCH_ROWS = 5000
+# Pages (4 KB) returned to the filesystem per maintenance pass
+VACUUM_PAGES = 2000
+MAINTENANCE_INTERVAL = 6 * 3600
+
+COLUMNS = ('id', 'user_id', 'movie_title', 'genres', 'rating', 'recommendation_date')
+
+
+def expired_ids(conn, days=HISTORY_DAYS, rows=HISTORY_ROWS):
+    """IDs of history rows outside their user's window, oldest first."""
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    return [row_id for row_id, in conn.execute(
+        "SELECT id FROM (SELECT id, recommendation_date, "
+        "ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id DESC) AS recency FROM recommended_movies) "
+        "WHERE recency > ? OR recommendation_date < ? ORDER BY id",
+        (rows, cutoff))]
+
+
+def rollups(rows):
+    """Per-(user, day) counts, rating sums and rated counts; per-(user, genre) and per-(user, rating) counts.
+
+    Rows without a rating count towards the day's recommendations but not
+    its rated count, so rating_sum / rated stays an unbiased average.
+    """
+    daily = defaultdict(lambda: [0, 0.0, 0])
+    genres = Counter()
+    ratings = Counter()
+    for _, user_id, _, row_genres, rating, date in rows:
+        day = daily[user_id, (date or '')[:10]]
+        day[0] += 1
+        if rating is not None:
+            day[1] += rating
+            day[2] += 1
+            ratings[user_id, rating] += 1
+        for genre in (row_genres or '').split(', '):
+            if genre:
+                genres[user_id, genre] += 1
+    return daily, genres, ratings
+
+
+def archive_path(archive_dir, batch_id):
+    return os.path.join(archive_dir, f"recommendations-{batch_id:08d}.jsonl.gz")
+
+
+def write_archive(rows, path):
+    """Rows as gzipped JSON lines at ``path``, durable before the rows are deleted."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(COLUMNS, row)), separators=(',', ':')).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def compact_history(storage, days=HISTORY_DAYS, rows=HISTORY_ROWS, archive_dir=ARCHIVE_DIR, batch_rows=BATCH_ROWS):
+    """Roll up, archive and delete expired history; returns (rows archived, archive files)."""
+    conn = storage.connect()
+    try:
+        ids = expired_ids(conn, days, rows)
+        paths = []
+        for start in range(0, len(ids), batch_rows):
+            batch = ids[start:start + batch_rows]
+            placeholders = ','.join('?' * len(batch))
+            with conn:
+                # Write-locked from the read on, so the batch is exactly what gets deleted
+                conn.execute("BEGIN IMMEDIATE")
+                expired = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM recommended_movies WHERE id IN ({placeholders}) ORDER BY id",
+                                       batch).fetchall()
+                if not expired:
+                    continue
+                # The file is named after a batch row of this same transaction. A
+                # crash before the commit rolls the row back, so the next pass
+                # reuses its id and overwrites the orphaned file instead of
+                # archiving the surviving rows a second time under a new name.
+                batch_id = conn.execute(
+                    "INSERT INTO history_archives (first_id, last_id, rows, path, created) VALUES (?, ?, ?, '', ?)",
+                    (expired[0][0], expired[-1][0], len(expired), now())).lastrowid
+                path = write_archive(expired, archive_path(archive_dir, batch_id))
+                conn.execute("UPDATE history_archives SET path = ? WHERE batch_id = ?", (path, batch_id))
+
+                daily, genres, ratings = rollups(expired)
+                conn.executemany(
+                    "INSERT INTO recommendation_daily (user_id, day, recommendations, rating_sum, rated) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (user_id, day) DO UPDATE SET recommendations = recommendations + excluded.recommendations, "
+                    "rating_sum = rating_sum + excluded.rating_sum, rated = rated + excluded.rated",
+                    [(user_id, day, count, rating_sum, rated)
+                     for (user_id, day), (count, rating_sum, rated) in daily.items()])
+                conn.executemany(
+                    "INSERT INTO recommendation_genres (user_id, genre, recommendations) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, genre) DO UPDATE SET recommendations = recommendations + excluded.recommendations",
+                    [(user_id, genre, count) for (user_id, genre), count in genres.items()])
+                conn.executemany(
+                    "INSERT INTO recommendation_ratings (user_id, rating, recommendations) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, rating) DO UPDATE SET recommendations = recommendations + excluded.recommendations",
+                    [(user_id, rating, count) for (user_id, rating), count in ratings.items()])
+                conn.execute(f"DELETE FROM recommended_movies WHERE id IN ({placeholders})", batch)
+            paths.append(path)
+        return len(ids), paths
+    finally:
+        conn.close()
+
+
+def incremental_vacuum(storage, pages=VACUUM_PAGES, convert=False):
+    """Return up to ``pages`` free pages to the filesystem; returns how many were free before.
+
+    A file not in INCREMENTAL mode is converted with a full VACUUM when
+    ``convert`` is set, and otherwise left alone (None is returned).
+    """
+    # isolation_level=None: VACUUM and auto_vacuum changes cannot run inside a transaction
+    conn = sqlite3.connect(storage.db_path, isolation_level=None, timeout=DB_TIMEOUT)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if not convert:
+                return None
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # Each step of the pragma frees one page; fetchall runs it to completion
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        return free
+    finally:
+        conn.close()
+
+
+def run_maintenance(storage, days=HISTORY_DAYS, rows=HISTORY_ROWS, archive_dir=ARCHIVE_DIR, vacuum_pages=VACUUM_PAGES,
+                    convert=False):
+    started = time.perf_counter()
+    archived, paths = compact_history(storage, days, rows, archive_dir)
+    free = incremental_vacuum(storage, vacuum_pages, convert)
+    return {'archived': archived, 'files': paths, 'free_pages': free, 'seconds': time.perf_counter() - started}
+
+
+class Maintenance:
+    """Runs ``run_maintenance`` every ``interval`` seconds on a daemon thread.
+
+    Failures (e.g. the database locked by a long write) are kept in
+    ``last_error`` and retried on the next pass.
+    """
+
+    def __init__(self, storage, interval=MAINTENANCE_INTERVAL, **options):
+        self.storage = storage
+        self.interval = interval
+        self.options = options
+        self.last_run = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="maintenance", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.last_run = run_maintenance(self.storage, **self.options)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            self._stop.wait(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--days', type=int, default=HISTORY_DAYS, help='raw history kept per user, in days')
+    parser.add_argument('--rows', type=int, default=HISTORY_ROWS, help='raw history rows kept per user')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    parser.add_argument('--vacuum-pages', type=int, default=VACUUM_PAGES)
+    args = parser.parse_args()
+
+    storage = Storage(args.db)
+    storage.init()
+    before = os.path.getsize(args.db)
+    # Run by an operator, so this is where an old file's one-time full VACUUM happens
+    result = run_maintenance(storage, args.days, args.rows, args.archive_dir, args.vacuum_pages, convert=True)
+    print(f"archived {result['archived']:,} rows into {len(result['files'])} files under {args.archive_dir}, "
+          f"vacuumed {min(result['free_pages'], args.vacuum_pages):,} of {result['free_pages']:,} free pages "
+          f"in {result['seconds']:.1f}s ({before / 1e6:.1f} MB -> {os.path.getsize(args.db) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# engine/sessions.py
+"""Server-side login sessions, shared by the Streamlit app and the API.
+
+A session is a random id the client keeps (the app's remember-me cookie,
+or ``Authorization: Bearer <id>`` for the API); the ``sessions`` table in
+the users database maps it to a user until it expires, is revoked or the
+account is deactivated.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import time
+
+from engine.storage import DB_TIMEOUT
+
+SESSION_TTL = 14 * 24 * 3600
+SESSION_SECRET_PATH = ".session_secret"
+SESSION_COOKIE = "movie_thruster_session"
+USERS_DB_PATH = "users.db"
+
+
+def session_secret(path=SESSION_SECRET_PATH):
+    """HMAC key for session ids: SESSION_SECRET, else one generated once and kept on disk."""
+    secret = os.getenv('SESSION_SECRET')
+    if secret:
+        return secret.encode()
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    # Written in full to a private temporary file, then linked into place:
+    # a process racing us either wins the link and we read its secret, or
+    # loses it and reads ours; nobody ever reads a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(secrets.token_hex(32).encode())
+    try:
+        os.link(tmp_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class SessionStore:
+    """Remember-me sessions, kept server-side in the users database.
+
+    The browser only holds a random session id in a cookie; the table keeps
+    its HMAC (a leaked database cannot be replayed as cookies), the user and
+    the expiry. Logging out deletes the row, ``revoke_user`` ends every
+    session of an account, and a deactivated account cannot be restored.
+    """
+
+    def __init__(self, db_path=USERS_DB_PATH, secret=None, ttl=SESSION_TTL):
+        self.db_path = db_path
+        self.secret = secret if secret is not None else session_secret()
+        self.ttl = ttl
+
+    def connect(self):
+        return sqlite3.connect(self.db_path, timeout=DB_TIMEOUT)
+
+    def init(self):
+        conn = self.connect()
+        conn.execute("""CREATE TABLE IF NOT EXISTS sessions
+                        (token_hash TEXT PRIMARY KEY,
+                        user_id INTEGER NOT NULL,
+                        created REAL NOT NULL,
+                        expires REAL NOT NULL,
+                        revoked INTEGER NOT NULL DEFAULT 0)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)")
+        conn.commit()
+        conn.close()
+
+    def _hash(self, session_id):
+        return hmac.new(self.secret, session_id.encode(), hashlib.sha256).hexdigest()
+
+    def create(self, user_id):
+        """A new session id for ``user_id`` and its expiry (epoch seconds)."""
+        session_id = secrets.token_urlsafe(32)
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+            conn.execute("INSERT INTO sessions (token_hash, user_id, created, expires) VALUES (?, ?, ?, ?)",
+                         (self._hash(session_id), user_id, now, now + self.ttl))
+        conn.close()
+        return session_id, now + self.ttl
+
+    def lookup(self, session_id):
+        """(user_data, expires) of a live session of an active account, else None."""
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT u.id, u.username, u.email, s.expires FROM sessions s JOIN users u ON u.id = s.user_id "
+                               "WHERE s.token_hash = ? AND s.revoked = 0 AND s.expires > ? AND u.is_active = 1",
+                               (self._hash(session_id), time.time())).fetchone()
+        except sqlite3.OperationalError as e:
+            # No accounts yet (the app creates the users table), so no session either
+            if 'no such table' not in str(e):
+                raise
+            row = None
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        user_id, username, email, expires = row
+        return {"id": user_id, "username": username, "email": email}, expires
+
+    def delete(self, session_id):
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE token_hash = ?", (self._hash(session_id),))
+        conn.close()
+
+    def revoke_user(self, user_id):
+        """End every session of ``user_id``, e.g. after a password change or deactivation."""
+        conn = self.connect()
+        with conn:
+            conn.execute("UPDATE sessions SET revoked = 1 WHERE user_id = ?", (user_id,))
+        conn.close()
@@ -0,0 +1,92 @@
+# engine/similarity.py
+import os
+
+from engine.ann import ANN_PATH, IVFIndex
+from engine.diversity import diverse_top_k
+from engine.neighbors import NEIGHBORS_PATH, NeighborTable, pool_dense, pool_table, pooled_top_k, top_k_rows
+from engine.result_cache import artifact_version
+from engine.similarity_build import FEATURES_PATH, FeatureStore
+from engine.similarity_store import load_similarity
+
+SIMILARITY_PATH = os.getenv('SIMILARITY_PATH', 'data/similarity.pkl')
+
+
+class SimilarityIndex:
+    """Every similarity source for one catalog, queried by row position.
+
+    ``dense`` is the N x N matrix (any stored precision), ``table`` the
+    precomputed top-K and ``ann`` the approximate IVF index. Any of them may
+    be None; queries use the cheapest exact source that can answer. The ANN
+    index is a last resort, only asked when neither exact source matches
+    the catalog; ``similarity_build add`` extends it along with the
+    features, anything else that rewrites them retires it until it is
+    rebuilt.
+    """
+
+    def __init__(self, dense=None, table=None, ann=None):
+        self.dense = dense
+        self.table = table
+        self.ann = ann
+
+    @classmethod
+    def load(cls, catalog_size, movies_path, similarity_path=SIMILARITY_PATH, neighbors_path=NEIGHBORS_PATH,
+             features_path=FEATURES_PATH, ann_path=ANN_PATH):
+        """Load whatever artifacts exist and still match the catalog."""
+        dense = load_similarity(similarity_path) if os.path.exists(similarity_path) else None
+        # Movies appended incrementally (engine.similarity_build add) are only in
+        # the neighbour table; a dense matrix for a smaller catalog would misalign rows
+        if dense is not None and dense.shape[0] != catalog_size:
+            dense = None
+
+        table = None
+        if os.path.exists(neighbors_path):
+            table = NeighborTable.load(neighbors_path)
+            if table.version != artifact_version(movies_path, similarity_path):
+                table = None
+
+        ann = None
+        if os.path.exists(ann_path) and os.path.exists(features_path):
+            ann = IVFIndex.load(ann_path, FeatureStore.load(features_path).matrix)
+            if ann.version != artifact_version(features_path) or len(ann) != catalog_size:
+                ann = None
+
+        return cls(dense, table, ann)
+
+    def similar(self, row, n, diversity=0.0):
+        """Positions of the ``n`` movies most similar to ``row``, best first.
+
+        ``diversity`` in [0, 1) trades similarity for variety via MMR (0 = off).
+        """
+        # MMR needs candidate-to-candidate similarity, so only with the dense matrix
+        if diversity and self.dense is not None:
+            return diverse_top_k(self.dense, row, n, lam=1.0 - diversity).tolist()
+
+        # Serve from the precomputed table when it is deep enough (or the only source)
+        if self.table is not None and (n <= self.table.k or self.dense is None):
+            return self.table.neighbors(row, n).tolist()
+
+        # No exact source for this catalog (stale table, no dense matrix): approximate
+        if self.dense is None and self.ann is not None:
+            indices, _ = self.ann.search(row, n)
+            return indices.tolist()
+
+        if self.dense is None:
+            raise LookupError("no similarity data loaded for this catalog")
+
+        indices, _ = top_k_rows(self.dense[row:row + 1], row, n)
+        return indices[0].tolist()
+
+    def pooled(self, seeds, k, pooling='sum'):
+        """Top-``k`` (positions, scores) against every seed at once, seeds excluded."""
+        if len(seeds) == 0:
+            return [], []
+
+        if self.dense is not None:
+            pooled = pool_dense(self.dense, seeds, pooling)
+        elif self.table is not None:
+            pooled = pool_table(self.table, seeds, pooling)
+        else:
+            raise LookupError("no similarity data loaded for this catalog")
+
+        positions, scores = pooled_top_k(pooled, seeds, k)
+        return positions.tolist(), scores.tolist()
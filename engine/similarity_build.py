@@ -0,0 +1,329 @@
+# engine/similarity_build.py
+"""Similarity build pipeline over bag-of-tags feature vectors.
+
+Keeps the sparse, L2-normalised tag vectors (data/features.npz) next to the
+neighbour table, so adding a movie only costs its own row and column:
+one sparse mat-vec against the catalog plus a top-K merge for the rows it
+displaces. Nothing N x N is rebuilt.
+
+A full build ranks row blocks on a process pool. Each worker holds one
+``block_rows x N`` float32 block at a time and keeps only its top-K, so
+peak memory is set by ``--memory-mb`` rather than by N squared.
+
+    python -m engine.similarity_build build --workers 8 --memory-mb 2048
+    python -m engine.similarity_build add --movie-id 603 --title "The Matrix" --tags "..."
+"""
+import argparse
+import os
+import pickle
+import re
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+# scipy is imported where it is used: the app imports this module for FEATURES_PATH
+# on every start, but only needs sparse matrices when it loads an ANN index
+
+from engine.neighbors import NEIGHBORS_PATH, NeighborTable, top_k_rows
+from engine.result_cache import artifact_version
+
+FEATURES_PATH = 'data/features.npz'
+MAX_FEATURES = 5000
+NEIGHBORS_K = 50
+BUILD_MEMORY_MB = 1024
+# Dense block, its -inf masked copy and the partition scratch are alive together
+BLOCK_COPIES = 3
+
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+STOP_WORDS = frozenset("""
+a about above after again against all almost alone along already also although always am among an and
+another any anyhow anyone anything anyway anywhere are around as at back be became because become becomes
+been before behind being below beside besides between beyond both but by can cannot could did do does doing
+done down during each either else elsewhere enough even ever every everyone everything everywhere except few
+for former formerly from further had has have having he her here hers herself him himself his how however i
+if in indeed into is it its itself just last latter least less made many may me meanwhile might mine more
+moreover most mostly much must my myself namely neither never nevertheless next no nobody none nor not nothing
+now nowhere of off often on once one only onto or other others otherwise our ours ourselves out over own per
+perhaps rather re same see seem seemed seeming seems several she should since so some somehow someone something
+sometime sometimes somewhere still such than that the their theirs them themselves then there thereafter
+thereby therefore therein these they this those though through throughout thus to together too toward towards
+under until up upon us very via was we well were what whatever when whence whenever where whereas wherever
+whether which while who whoever whole whom whose why will with within without would yet you your yours
+yourself yourselves
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOP_WORDS]
+
+
+class FeatureStore:
+    """Bag-of-tags vectors for the catalog, rows L2-normalised so that
+    cosine similarity is a plain sparse dot product."""
+
+    def __init__(self, vocabulary, matrix):
+        self.vocabulary = vocabulary
+        self.matrix = matrix
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @classmethod
+    def fit(cls, tags, max_features=MAX_FEATURES):
+        """Vocabulary = the ``max_features`` most frequent terms (ties alphabetical)."""
+        documents = [tokenize(text) for text in tags]
+        totals = Counter(token for tokens in documents for token in tokens)
+        terms = sorted(totals, key=lambda term: (-totals[term], term))[:max_features]
+        vocabulary = {term: column for column, term in enumerate(sorted(terms))}
+        store = cls(vocabulary, None)
+        store.matrix = store._vectorize(documents)
+        return store
+
+    def transform(self, tags):
+        """Vectorize new movies with the existing vocabulary; unknown terms are dropped."""
+        return self._vectorize([tokenize(text) for text in tags])
+
+    def _vectorize(self, documents):
+        from scipy import sparse
+
+        indptr = [0]
+        indices = []
+        counts = []
+        for tokens in documents:
+            row = Counter(self.vocabulary[token] for token in tokens if token in self.vocabulary)
+            indices.extend(row.keys())
+            counts.extend(row.values())
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(documents), len(self.vocabulary)),
+        )
+        matrix.sort_indices()
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms, dtype=np.float32) @ matrix)
+
+    def append(self, rows):
+        from scipy import sparse
+
+        self.matrix = sparse.vstack([self.matrix, rows], format='csr')
+
+    def save(self, path=FEATURES_PATH):
+        terms = np.array(sorted(self.vocabulary, key=self.vocabulary.get))
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+                 shape=np.array(self.matrix.shape), terms=terms)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=FEATURES_PATH):
+        from scipy import sparse
+
+        with np.load(path) as data:
+            matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']), shape=tuple(data['shape']))
+            vocabulary = {str(term): column for column, term in enumerate(data['terms'])}
+        return cls(vocabulary, matrix)
+
+
+def block_rows_for(n, workers=1, memory_mb=BUILD_MEMORY_MB):
+    """Rows per block so that all workers' dense blocks fit in ``memory_mb``."""
+    per_row = n * np.dtype(np.float32).itemsize * BLOCK_COPIES
+    return int(max(1, min(n, memory_mb * 2**20 // (per_row * workers))))
+
+
+# Set in each worker by _init_worker, so the features are loaded once per process
+_worker_matrix = None
+_worker_k = None
+
+
+def _init_worker(features_path, k):
+    global _worker_matrix, _worker_k
+    _worker_matrix = FeatureStore.load(features_path).matrix
+    _worker_k = k
+
+
+def _rank_block(bounds):
+    start, stop = bounds
+    return (start, *_rank_rows(_worker_matrix, start, stop, _worker_k))
+
+
+def _rank_rows(matrix, start, stop, k):
+    # sparse @ dense is a single pass over the catalog's nonzeros, far cheaper
+    # than a sparse @ sparse product whose result is mostly filled in anyway
+    block = (matrix @ matrix[start:stop].toarray().T).T
+    return top_k_rows(block, start, k)
+
+
+def exact_neighbors(features, k=NEIGHBORS_K, block_rows=None, workers=1, memory_mb=BUILD_MEMORY_MB):
+    """Top-``k`` cosine neighbours of every row, ranked in dense row blocks.
+
+    Only the top-K of each block is kept, so the output is ``N x K`` and the
+    working set is ``workers`` blocks of ``block_rows x N`` float32, sized
+    from ``memory_mb`` unless ``block_rows`` is given.
+    """
+    matrix = features.matrix
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    block_rows = block_rows or block_rows_for(n, workers, memory_mb)
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    blocks = [(start, min(start + block_rows, n)) for start in range(0, n, block_rows)]
+
+    if workers <= 1:
+        for start, stop in blocks:
+            indices[start:stop], scores[start:stop] = _rank_rows(matrix, start, stop, k)
+        return NeighborTable(indices, scores)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        features_path = os.path.join(tmp_dir, 'features.npz')
+        features.save(features_path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features_path, k)) as pool:
+            for start, block_indices, block_scores in pool.map(_rank_block, blocks):
+                indices[start:start + len(block_indices)] = block_indices
+                scores[start:start + len(block_scores)] = block_scores
+    return NeighborTable(indices, scores)
+
+
+def append_movies(features, table, new_rows):
+    """Add ``new_rows`` (sparse, normalised) to the features and neighbour table.
+
+    Cost per added movie is one sparse mat-vec (O(nnz) ~ O(N)) plus an
+    O(K log K) merge for each existing row whose K-th score it beats.
+    """
+    n_old = len(features)
+    features.append(new_rows)
+    n_new = len(features)
+    k = table.k
+
+    # Similarity of every movie, old and new, to each added movie: (n_new, m)
+    columns = (features.matrix @ new_rows.T).toarray().astype(np.float32)
+
+    # New rows: rank the fresh columns like any other row, skipping self
+    new_indices, new_scores = top_k_rows(columns.T, n_old, k)
+
+    # Old rows: merge in the added movies where they beat the current K-th neighbour
+    old_scores = columns[:n_old]
+    affected = np.flatnonzero((old_scores > table.scores[:, -1:]).any(axis=1))
+    indices = table.indices.copy()
+    scores = table.scores.copy()
+    if affected.size:
+        added_ids = np.broadcast_to(np.arange(n_old, n_new, dtype=np.int32), (affected.size, n_new - n_old))
+        merged_ids = np.concatenate([indices[affected], added_ids], axis=1)
+        merged_scores = np.concatenate([scores[affected], old_scores[affected]], axis=1)
+        order = np.lexsort((merged_ids, -merged_scores), axis=1)[:, :k]
+        indices[affected] = np.take_along_axis(merged_ids, order, axis=1)
+        scores[affected] = np.take_along_axis(merged_scores, order, axis=1)
+
+    merged = NeighborTable(np.vstack([indices, new_indices]), np.vstack([scores, new_scores]))
+    return merged, affected.size
+
+
+def _load_movies(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _save_movies(movies_dict, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(movies_dict, f)
+    os.replace(tmp_path, path)
+
+
+def build(args):
+    movies_dict = _load_movies(args.movies)
+    tags = [movies_dict['tags'][row] for row in sorted(movies_dict['tags'])]
+
+    start = time.perf_counter()
+    features = FeatureStore.fit(tags, args.max_features)
+    table = exact_neighbors(features, args.k, args.block_rows, args.workers, args.memory_mb)
+    elapsed = time.perf_counter() - start
+
+    features.save(args.features)
+    if args.dense:
+        with open(args.similarity, 'wb') as f:
+            pickle.dump((features.matrix @ features.matrix.T).toarray(), f)
+    table.version = artifact_version(args.movies, args.similarity)
+    table.save(args.neighbors)
+    print(f"built {len(features)} movies x {len(features.vocabulary)} terms, top-{table.k} neighbours "
+          f"on {args.workers} workers in {elapsed:.2f}s ({len(features) / elapsed:,.0f} rows/s)")
+
+
+def add(args):
+    # Imported here: engine.ann imports this module for the feature store
+    from engine.ann import ANN_PATH, IVFIndex
+
+    movies_dict = _load_movies(args.movies)
+    features = FeatureStore.load(args.features)
+    table = NeighborTable.load(args.neighbors)
+    if len(features) != len(movies_dict['title']) or len(table) != len(features):
+        raise SystemExit("features/neighbours are out of sync with the catalog, run `build` first")
+
+    # Rewriting the features changes their version, which would retire the
+    # ANN index; extend it too as long as it was built from these features
+    ann_path = args.ann or ANN_PATH
+    ann = None
+    if os.path.exists(ann_path):
+        ann = IVFIndex.load(ann_path)
+        if ann.version != artifact_version(args.features) or len(ann) != len(features):
+            print(f"{ann_path} was built from other features and is left as is; "
+                  f"rebuild it with `python -m engine.ann build`")
+            ann = None
+
+    start = time.perf_counter()
+    new_rows = features.transform([args.tags])
+    table, affected = append_movies(features, table, new_rows)
+    if ann is not None:
+        ann.append(new_rows, len(table) - new_rows.shape[0])
+    elapsed = time.perf_counter() - start
+
+    # Keys of the pickled columns are DataFrame labels and have gaps; rows are positional
+    row = len(movies_dict['title'])
+    key = max(movies_dict['title']) + 1
+    movies_dict['movie_id'][key] = args.movie_id
+    movies_dict['title'][key] = args.title
+    movies_dict['tags'][key] = args.tags
+    _save_movies(movies_dict, args.movies)
+    features.save(args.features)
+    table.version = artifact_version(args.movies, args.similarity)
+    table.save(args.neighbors)
+    if ann is not None:
+        ann.version = artifact_version(args.features)
+        ann.save(ann_path)
+    print(f"added {args.title!r} as row {row} in {elapsed * 1000:.1f}ms, updated {affected} neighbour lists"
+          + (", extended the ANN index" if ann is not None else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--movies', default='data/movie_dict.pkl')
+    parser.add_argument('--similarity', default='data/similarity.pkl')
+    parser.add_argument('--features', default=FEATURES_PATH)
+    parser.add_argument('--neighbors', default=NEIGHBORS_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='vectorize the whole catalog and rank all neighbours')
+    build_parser.add_argument('--k', type=int, default=NEIGHBORS_K)
+    build_parser.add_argument('--max-features', type=int, default=MAX_FEATURES)
+    build_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    build_parser.add_argument('--memory-mb', type=int, default=BUILD_MEMORY_MB,
+                              help='budget for the dense blocks of all workers together')
+    build_parser.add_argument('--block-rows', type=int, help='override the block size derived from --memory-mb')
+    build_parser.add_argument('--dense', action='store_true', help='also rewrite the dense N x N similarity pickle (small catalogs only)')
+    build_parser.set_defaults(handler=build)
+
+    add_parser = commands.add_parser('add', help='append one movie without rebuilding')
+    add_parser.add_argument('--movie-id', type=int, required=True)
+    add_parser.add_argument('--title', required=True)
+    add_parser.add_argument('--tags', required=True)
+    add_parser.add_argument('--ann', help='ANN index to extend if it exists, default data/ann_index.npz')
+    add_parser.set_defaults(handler=add)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# engine/similarity_store.py
+"""Reduced-precision storage for the dense similarity matrix.
+
+float32 and float16 are stored as-is; uint8 maps [lo, hi] linearly onto
+0..255 and is dequantized to float32 only for the rows a query touches, so
+the full-precision matrix is never materialised at serve time.
+
+    python -m engine.similarity_store verify --k 25
+    python -m engine.similarity_store convert --format float16
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from engine.neighbors import top_k_rows
+
+SIMILARITY_FORMATS = ('float64', 'float32', 'float16', 'uint8')
+UINT8_LEVELS = 255
+
+
+class QuantizedSimilarity:
+    """uint8 similarity matrix that indexes like the float array it replaces.
+
+    ``similarity[row]``, ``similarity[a:b]``, ``similarity[rows]`` and
+    ``similarity[np.ix_(rows, cols)]`` all return float32 values.
+    """
+
+    def __init__(self, codes, lo, hi):
+        self.codes = codes
+        self.lo = float(lo)
+        self.scale = (float(hi) - float(lo)) / UINT8_LEVELS
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    def __getitem__(self, key):
+        return self.codes[key].astype(np.float32) * np.float32(self.scale) + np.float32(self.lo)
+
+
+def quantize(similarity, fmt):
+    """``similarity`` stored in ``fmt``, as the array/wrapper load_similarity would return."""
+    if fmt == 'uint8':
+        lo, hi = float(similarity.min()), float(similarity.max())
+        span = (hi - lo) or 1.0
+        codes = np.empty(similarity.shape, dtype=np.uint8)
+        # Row blocks keep the float temporaries small for large catalogs
+        for start in range(0, similarity.shape[0], 1024):
+            block = (similarity[start:start + 1024] - lo) * (UINT8_LEVELS / span)
+            codes[start:start + 1024] = np.rint(block)
+        return QuantizedSimilarity(codes, lo, lo + span)
+    return np.asarray(similarity, dtype=fmt)
+
+
+def save_similarity(stored, path):
+    tmp_path = f"{path}.tmp.npz"
+    if isinstance(stored, QuantizedSimilarity):
+        np.savez(tmp_path, values=stored.codes, lo=stored.lo, hi=stored.lo + stored.scale * UINT8_LEVELS)
+    else:
+        np.savez(tmp_path, values=stored)
+    os.replace(tmp_path, path)
+
+
+def load_similarity(path):
+    """Dense similarity from the original pickle or a converted ``.npz``."""
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    with np.load(path) as data:
+        if data['values'].dtype == np.uint8:
+            return QuantizedSimilarity(data['values'], data['lo'], data['hi'])
+        return data['values']
+
+
+def converted_path(path, fmt):
+    return f"{os.path.splitext(path)[0]}_{fmt}.npz"
+
+
+def ranking_changes(reference, candidate, k, block_rows=256):
+    """Rows whose top-``k`` differs from ``reference``: (order changed, set changed)."""
+    order_changed = set_changed = 0
+    for start in range(0, reference.shape[0], block_rows):
+        expected, _ = top_k_rows(reference[start:start + block_rows], start, k)
+        found, _ = top_k_rows(candidate[start:start + block_rows], start, k)
+        order_changed += int((expected != found).any(axis=1).sum())
+        set_changed += int((np.sort(expected, axis=1) != np.sort(found, axis=1)).any(axis=1).sum())
+    return order_changed, set_changed
+
+
+def verify(args):
+    reference = np.asarray(load_similarity(args.similarity), dtype=np.float64)
+    rows = reference.shape[0]
+    print(f"{rows} x {rows} similarity, top-{args.k} compared on every row against float64")
+    identical = 'float64'
+    for fmt in SIMILARITY_FORMATS[1:]:
+        start = time.perf_counter()
+        stored = quantize(reference, fmt)
+        order_changed, set_changed = ranking_changes(reference, stored, args.k)
+        error = max(float(np.abs(stored[row:row + 1024] - reference[row:row + 1024]).max())
+                    for row in range(0, rows, 1024))
+        print(f"  {fmt:<8} {stored.nbytes / 2**20:8.1f} MB  max error {error:.2e}  "
+              f"order changed {order_changed / rows:7.2%}  set changed {set_changed / rows:7.2%}  "
+              f"({time.perf_counter() - start:.1f}s)")
+        if order_changed == 0:
+            identical = fmt
+    print(f"smallest format with identical top-{args.k} rankings: {identical}")
+    return 0
+
+
+def convert(args):
+    reference = load_similarity(args.similarity)
+    path = args.output or converted_path(args.similarity, args.format)
+    save_similarity(quantize(reference, args.format), path)
+    print(f"wrote {path} ({os.path.getsize(path) / 2**20:.1f} MB), serve it with SIMILARITY_PATH={path}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--similarity', default='data/similarity.pkl', help='full-precision source')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    verify_parser = commands.add_parser('verify', help='how often each format changes the top-k ordering')
+    verify_parser.add_argument('--k', type=int, default=25)
+    verify_parser.set_defaults(handler=verify)
+
+    convert_parser = commands.add_parser('convert', help='write the matrix in a smaller format')
+    convert_parser.add_argument('--format', choices=SIMILARITY_FORMATS[1:], required=True)
+    convert_parser.add_argument('--output')
+    convert_parser.set_defaults(handler=convert)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
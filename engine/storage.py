@@ -0,0 +1,352 @@
+# engine/storage.py
+import argparse
+import sqlite3
+from collections import Counter
+from datetime import datetime
+
+DB_PATH = "movies.db"
+DEFAULT_USER = "default_user"
+# PRAGMA user_version of the current schema; init() migrates older files up to it
+SCHEMA_VERSION = 3
+# Seconds a connection waits for another writer (e.g. retention's delete
+# batches) before giving up with "database is locked"
+DB_TIMEOUT = 30
+
+
+def now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Storage:
+    """Recommendation history, watchlist and preferences in SQLite, for one user.
+
+    Every table is partitioned by ``user_id`` and indexed on it first, so a
+    user's queries touch only that user's rows however many users share the
+    file. One short-lived connection per call, so a Storage can be shared by
+    any number of threads; ``for_user`` gives another user's view of the
+    same file.
+    """
+
+    def __init__(self, db_path=DB_PATH, user_id=DEFAULT_USER):
+        self.db_path = db_path
+        self.user_id = str(user_id)
+
+    def for_user(self, user_id):
+        return Storage(self.db_path, user_id)
+
+    def connect(self):
+        return sqlite3.connect(self.db_path, timeout=DB_TIMEOUT)
+
+    def init(self):
+        conn = self.connect()
+        c = conn.cursor()
+        # Only takes effect on a new file; `python -m engine.retention` converts older ones once
+        c.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        c.execute(f'''CREATE TABLE IF NOT EXISTS recommended_movies
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    movie_title TEXT,
+                    genres TEXT,
+                    rating REAL,
+                    recommendation_date TEXT,
+                    user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER}')''')
+
+        # Create user preferences table
+        c.execute('''CREATE TABLE IF NOT EXISTS user_preferences
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    preferred_genres TEXT,
+                    min_rating REAL,
+                    created_date TEXT)''')
+
+        # Create watchlist table
+        c.execute('''CREATE TABLE IF NOT EXISTS watchlist
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    movie_id INTEGER,
+                    movie_title TEXT,
+                    added_date TEXT)''')
+
+        # History older than the retention window, downsampled by engine.retention
+        c.execute('''CREATE TABLE IF NOT EXISTS recommendation_daily
+                    (user_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    recommendations INTEGER NOT NULL,
+                    rating_sum REAL NOT NULL,
+                    rated INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, day))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS recommendation_genres
+                    (user_id TEXT NOT NULL,
+                    genre TEXT NOT NULL,
+                    recommendations INTEGER NOT NULL,
+                    PRIMARY KEY (user_id, genre))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS recommendation_ratings
+                    (user_id TEXT NOT NULL,
+                    rating REAL NOT NULL,
+                    recommendations INTEGER NOT NULL,
+                    PRIMARY KEY (user_id, rating))''')
+        # One row per archive file, committed with the delete of the rows it holds
+        c.execute('''CREATE TABLE IF NOT EXISTS history_archives
+                    (batch_id INTEGER PRIMARY KEY,
+                    first_id INTEGER NOT NULL,
+                    last_id INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    created TEXT NOT NULL)''')
+
+        if c.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.migrate(c)
+            c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        conn.commit()
+        conn.close()
+
+    def migrate(self, c):
+        # History from before per-user storage had no user column; it stays with
+        # DEFAULT_USER until an account claims it (``claim_legacy``)
+        columns = {row[1] for row in c.execute("PRAGMA table_info(recommended_movies)")}
+        if 'user_id' not in columns:
+            c.execute(f"ALTER TABLE recommended_movies ADD COLUMN user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER}'")
+
+        # A movie is on a user's watchlist at most once; drop the duplicates older versions allowed
+        c.execute("DELETE FROM watchlist WHERE id NOT IN (SELECT MIN(id) FROM watchlist GROUP BY user_id, movie_id)")
+
+        # user_id leads every index, so per-user reads are range scans of that user's rows
+        c.execute("CREATE INDEX IF NOT EXISTS idx_recommended_user ON recommended_movies (user_id, id)")
+        c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_watchlist_user_movie ON watchlist (user_id, movie_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_user_added ON watchlist (user_id, added_date)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_preferences_user ON user_preferences (user_id, id)")
+
+        # Rollups now count rated rows apart from all rows; older ones were written as if every row had a rating
+        columns = {row[1] for row in c.execute("PRAGMA table_info(recommendation_daily)")}
+        if 'rated' not in columns:
+            c.execute("ALTER TABLE recommendation_daily ADD COLUMN rated INTEGER NOT NULL DEFAULT 0")
+            c.execute("UPDATE recommendation_daily SET rated = recommendations")
+
+    def claim_legacy(self):
+        """Move the rows kept under DEFAULT_USER, written before storage was per user, to this user.
+
+        History, watchlist and preferences are reassigned and rollups are
+        merged into the user's own, in one transaction; a movie already on the
+        user's watchlist is kept once. Returns the number of rows moved.
+        """
+        if self.user_id == DEFAULT_USER:
+            return 0
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                moved = 0
+                for table in ('recommended_movies', 'user_preferences'):
+                    moved += conn.execute(f"UPDATE {table} SET user_id = ? WHERE user_id = ?", (self.user_id, DEFAULT_USER)).rowcount
+                moved += conn.execute("UPDATE OR IGNORE watchlist SET user_id = ? WHERE user_id = ?", (self.user_id, DEFAULT_USER)).rowcount
+                conn.execute(
+                    "INSERT INTO recommendation_daily (user_id, day, recommendations, rating_sum, rated) "
+                    "SELECT ?, day, recommendations, rating_sum, rated FROM recommendation_daily WHERE user_id = ? "
+                    "ON CONFLICT (user_id, day) DO UPDATE SET recommendations = recommendations + excluded.recommendations, "
+                    "rating_sum = rating_sum + excluded.rating_sum, rated = rated + excluded.rated",
+                    (self.user_id, DEFAULT_USER))
+                conn.execute(
+                    "INSERT INTO recommendation_genres (user_id, genre, recommendations) "
+                    "SELECT ?, genre, recommendations FROM recommendation_genres WHERE user_id = ? "
+                    "ON CONFLICT (user_id, genre) DO UPDATE SET recommendations = recommendations + excluded.recommendations",
+                    (self.user_id, DEFAULT_USER))
+                conn.execute(
+                    "INSERT INTO recommendation_ratings (user_id, rating, recommendations) "
+                    "SELECT ?, rating, recommendations FROM recommendation_ratings WHERE user_id = ? "
+                    "ON CONFLICT (user_id, rating) DO UPDATE SET recommendations = recommendations + excluded.recommendations",
+                    (self.user_id, DEFAULT_USER))
+                for table in ('recommendation_daily', 'recommendation_genres', 'recommendation_ratings'):
+                    moved += conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (DEFAULT_USER,)).rowcount
+                # Left behind only where the user already had the movie
+                conn.execute("DELETE FROM watchlist WHERE user_id = ?", (DEFAULT_USER,))
+        finally:
+            conn.close()
+        return moved
+
+    def insert_recommendation(self, movie_title, genres, rating):
+        self.insert_recommendations([(movie_title, genres, rating)])
+
+    def insert_recommendations(self, rows):
+        """Record ``(title, genres, rating)`` rows in one transaction."""
+        date = now()
+        conn = self.connect()
+        conn.executemany("INSERT INTO recommended_movies (movie_title, genres, rating, recommendation_date, user_id) VALUES (?, ?, ?, ?, ?)",
+                         [(title, ', '.join(genres), rating, date, self.user_id) for title, genres, rating in rows])
+        conn.commit()
+        conn.close()
+
+    def fetch_recommendations(self, limit=10):
+        conn = self.connect()
+        data = conn.execute("SELECT movie_title, genres, rating, recommendation_date FROM recommended_movies WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                            (self.user_id, limit)).fetchall()
+        conn.close()
+        return data
+
+    def fetch_all_recommendations(self):
+        conn = self.connect()
+        data = conn.execute("SELECT movie_title, genres, rating, recommendation_date FROM recommended_movies WHERE user_id = ? ORDER BY id DESC",
+                            (self.user_id,)).fetchall()
+        conn.close()
+        return data
+
+    def recommendations_page(self, limit=10, before=None):
+        """One page of history, newest first, and the cursor of the next page (None on the last).
+
+        Keyset pagination: ``before`` is the last row id of the previous
+        page, so every page is one range scan of the (user_id, id) index no
+        matter how deep it is.
+        """
+        conn = self.connect()
+        data = conn.execute("SELECT id, movie_title, genres, rating, recommendation_date FROM recommended_movies "
+                            "WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                            (self.user_id, before if before is not None else 2 ** 63 - 1, limit + 1)).fetchall()
+        conn.close()
+        page = [row[1:] for row in data[:limit]]
+        return page, (data[limit - 1][0] if len(data) > limit else None)
+
+    def history_summary(self):
+        """Dashboard aggregates over all of the user's history, rollups included, computed in SQLite."""
+        conn = self.connect()
+        total, rated, rating_sum, unique_movies, latest = conn.execute(
+            "SELECT COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0), COUNT(DISTINCT movie_title), MAX(recommendation_date) "
+            "FROM recommended_movies WHERE user_id = ?", (self.user_id,)).fetchone()
+        daily = Counter(dict(conn.execute(
+            "SELECT substr(recommendation_date, 1, 10), COUNT(*) FROM recommended_movies WHERE user_id = ? GROUP BY 1",
+            (self.user_id,)).fetchall()))
+        ratings = Counter(dict(conn.execute(
+            "SELECT rating, COUNT(*) FROM recommended_movies WHERE user_id = ? AND rating IS NOT NULL GROUP BY rating",
+            (self.user_id,)).fetchall()))
+        genres = Counter()
+        for combination, count in conn.execute("SELECT genres, COUNT(*) FROM recommended_movies WHERE user_id = ? GROUP BY genres",
+                                               (self.user_id,)):
+            for genre in (combination or '').split(', '):
+                if genre:
+                    genres[genre] += count
+        conn.close()
+
+        rows = total
+        rolled_daily, rolled_genres, rolled_ratings = self.history_rollups()
+        for day, count, day_rating_sum, day_rated in rolled_daily:
+            daily[day] += count
+            total += count
+            rating_sum += day_rating_sum
+            rated += day_rated
+        genres.update(rolled_genres)
+        ratings.update(rolled_ratings)
+        if latest is None and rolled_daily:
+            latest = rolled_daily[-1][0]
+        return {'total': total, 'rows': rows, 'rated': rated, 'rating_sum': rating_sum, 'unique_movies': unique_movies, 'latest': latest,
+                'daily': sorted(daily.items()), 'ratings': sorted(ratings.items()),
+                # Rated recommendations rolled up before ratings were kept per value
+                'unbucketed_ratings': rated - sum(ratings.values()), 'genres': dict(genres)}
+
+    def most_recommended(self, limit=50):
+        """Titles recommended most often across all users, most frequent first."""
+        conn = self.connect()
+        data = conn.execute("SELECT movie_title FROM recommended_movies GROUP BY movie_title ORDER BY COUNT(*) DESC LIMIT ?",
+                            (limit,)).fetchall()
+        conn.close()
+        return [title for title, in data]
+
+    def count_recommendations(self):
+        """Recommendations ever recorded for the user, including rolled-up history."""
+        conn = self.connect()
+        count = conn.execute("SELECT COUNT(*) FROM recommended_movies WHERE user_id = ?", (self.user_id,)).fetchone()[0]
+        count += conn.execute("SELECT COALESCE(SUM(recommendations), 0) FROM recommendation_daily WHERE user_id = ?",
+                              (self.user_id,)).fetchone()[0]
+        conn.close()
+        return count
+
+    def history_rollups(self):
+        """Rolled-up history: ([(day, recommendations, rating_sum, rated)], {genre: recommendations},
+        {rating: recommendations})."""
+        conn = self.connect()
+        daily = conn.execute("SELECT day, recommendations, rating_sum, rated FROM recommendation_daily WHERE user_id = ? ORDER BY day",
+                             (self.user_id,)).fetchall()
+        genres = dict(conn.execute("SELECT genre, recommendations FROM recommendation_genres WHERE user_id = ?",
+                                   (self.user_id,)).fetchall())
+        ratings = dict(conn.execute("SELECT rating, recommendations FROM recommendation_ratings WHERE user_id = ?",
+                                    (self.user_id,)).fetchall())
+        conn.close()
+        return daily, genres, ratings
+
+    def clear_recommendations(self):
+        conn = self.connect()
+        for table in ('recommended_movies', 'recommendation_daily', 'recommendation_genres', 'recommendation_ratings'):
+            conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (self.user_id,))
+        conn.commit()
+        conn.close()
+
+    def add_to_watchlist(self, movie_id, movie_title):
+        conn = self.connect()
+        conn.execute("INSERT OR IGNORE INTO watchlist (user_id, movie_id, movie_title, added_date) VALUES (?, ?, ?, ?)",
+                     (self.user_id, movie_id, movie_title, now()))
+        conn.commit()
+        conn.close()
+
+    def get_watchlist(self):
+        conn = self.connect()
+        data = conn.execute("SELECT movie_id, movie_title FROM watchlist WHERE user_id = ? ORDER BY added_date DESC, id DESC",
+                            (self.user_id,)).fetchall()
+        conn.close()
+        return data
+
+    def watchlist_page(self, limit=10, after=None):
+        """One page of the watchlist, newest first, and the cursor of the next page (None on the last).
+
+        ``after`` is the (added_date, id) of the previous page's last row.
+        """
+        added_date, row_id = after if after is not None else ('\uffff', 0)
+        conn = self.connect()
+        # A row value comparison, so SQLite seeks the (user_id, added_date) index to the cursor
+        data = conn.execute("SELECT movie_id, movie_title, added_date, id FROM watchlist WHERE user_id = ? "
+                            "AND (added_date, id) < (?, ?) ORDER BY added_date DESC, id DESC LIMIT ?",
+                            (self.user_id, added_date, row_id, limit + 1)).fetchall()
+        conn.close()
+        page = [row[:2] for row in data[:limit]]
+        return page, (tuple(data[limit - 1][2:]) if len(data) > limit else None)
+
+    def count_watchlist(self):
+        conn = self.connect()
+        count = conn.execute("SELECT COUNT(*) FROM watchlist WHERE user_id = ?", (self.user_id,)).fetchone()[0]
+        conn.close()
+        return count
+
+    def remove_from_watchlist(self, movie_id):
+        conn = self.connect()
+        conn.execute("DELETE FROM watchlist WHERE user_id = ? AND movie_id = ?", (self.user_id, movie_id))
+        conn.commit()
+        conn.close()
+
+    def save_preferences(self, preferred_genres, min_rating):
+        conn = self.connect()
+        conn.execute("INSERT OR REPLACE INTO user_preferences (user_id, preferred_genres, min_rating, created_date) VALUES (?, ?, ?, ?)",
+                     (self.user_id, ','.join(preferred_genres), min_rating, now()))
+        conn.commit()
+        conn.close()
+
+    def get_preferences(self):
+        conn = self.connect()
+        data = conn.execute("SELECT preferred_genres, min_rating FROM user_preferences WHERE user_id = ? ORDER BY id DESC LIMIT 1",
+                            (self.user_id,)).fetchone()
+        conn.close()
+
+        if data:
+            return data[0].split(','), data[1]
+        return [], 5.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Give the history, watchlist and preferences from before "
+                                                 "per-user storage to one account")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--user-id', required=True, help="the account's id in the users database")
+    args = parser.parse_args()
+
+    storage = Storage(args.db, args.user_id)
+    storage.init()
+    print(f"moved {storage.claim_legacy():,} rows from {DEFAULT_USER} to user {args.user_id}")
+
+
+if __name__ == '__main__':
+    main()
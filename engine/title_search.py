@@ -0,0 +1,140 @@
+# engine/title_search.py
+import re
+import unicodedata
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_title(title):
+    """Lowercase, strip accents and collapse punctuation to single spaces."""
+    text = unicodedata.normalize('NFKD', str(title)).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+def title_ngrams(text, n=3, pad_end=True):
+    """Character n-grams of a normalized title.
+
+    Titles are padded on both sides so word boundaries count. Queries are only
+    padded at the start, so a half-typed last word is not penalised.
+    """
+    padded = f" {text} " if pad_end else f" {text}"
+    if len(padded) < n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def substring_distance(query, text):
+    """Edit distance between ``query`` and its best matching substring of ``text``.
+
+    Sellers' approximate substring matching: the alignment may start and end
+    anywhere in ``text``, so prefixes and mid-title matches cost nothing extra.
+    """
+    m = len(query)
+    column = list(range(m + 1))
+    best = m
+    for char in text:
+        previous_diagonal = column[0]
+        # Free start: a match may begin at any position of text
+        column[0] = 0
+        for i in range(1, m + 1):
+            current = column[i]
+            column[i] = min(
+                previous_diagonal + (query[i - 1] != char),
+                current + 1,
+                column[i - 1] + 1,
+            )
+            previous_diagonal = current
+        if column[m] < best:
+            best = column[m]
+            if best == 0:
+                break
+    return best
+
+
+class TitleIndex:
+    """Typo-tolerant title search over a fixed catalog.
+
+    Candidates come from an n-gram inverted index (one ``np.bincount`` over the
+    posting lists of the query's n-grams), and the best ``rerank`` candidates
+    are re-ordered by substring edit distance. Results are catalog positions,
+    so they can be fed straight into ``DataFrame.iloc``.
+    """
+
+    def __init__(self, titles, n=3):
+        self.n = n
+        self.titles = [str(title) for title in titles]
+        self.normalized = [normalize_title(title) for title in self.titles]
+
+        postings = {}
+        for position, text in enumerate(self.normalized):
+            for gram in title_ngrams(text, n):
+                postings.setdefault(gram, []).append(position)
+
+        # Compact CSR layout: one int32 array of positions plus per-gram offsets
+        self.vocabulary = {}
+        offsets = [0]
+        flat = []
+        for gram_id, (gram, positions) in enumerate(postings.items()):
+            self.vocabulary[gram] = gram_id
+            flat.extend(positions)
+            offsets.append(len(flat))
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.positions = np.asarray(flat, dtype=np.int32)
+        self.lengths = np.asarray([len(text) for text in self.normalized], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _coverage(self, grams):
+        """Fraction of the query's n-grams present in every title."""
+        slices = [
+            self.positions[self.offsets[gram_id]:self.offsets[gram_id + 1]]
+            for gram_id in (self.vocabulary.get(gram) for gram in grams)
+            if gram_id is not None
+        ]
+        if not slices:
+            return None
+        shared = np.bincount(np.concatenate(slices), minlength=len(self.titles))
+        return shared / len(grams)
+
+    def search(self, query, limit=10, rerank=32, min_coverage=0.5):
+        """Return ``[(position, score), ...]`` best match first.
+
+        ``limit=None`` returns every candidate above ``min_coverage``; only the
+        top ``rerank`` of those are re-ranked by edit distance, the rest keep
+        their n-gram coverage order.
+        """
+        text = normalize_title(query)
+        if not text:
+            return []
+
+        grams = title_ngrams(text, self.n, pad_end=False)
+        coverage = self._coverage(grams)
+        if coverage is None:
+            return []
+
+        # Very short queries have one or two grams, so demand all of them
+        threshold = 1.0 if len(grams) <= 2 else min_coverage
+        candidates = np.flatnonzero(coverage >= threshold)
+        if candidates.size == 0:
+            return []
+
+        # Order by coverage, preferring shorter titles on ties
+        order = np.lexsort((self.lengths[candidates], -coverage[candidates]))
+        candidates = candidates[order]
+
+        head = candidates[:rerank]
+        reranked = []
+        for position in head.tolist():
+            distance = substring_distance(text, self.normalized[position])
+            score = 1.0 - distance / len(text)
+            reranked.append((-score, -coverage[position], self.lengths[position], position, score))
+        reranked.sort()
+
+        results = [(position, score) for _, _, _, position, score in reranked]
+        if limit is None or limit > len(results):
+            tail = candidates[rerank:] if limit is None else candidates[rerank:rerank + limit - len(results)]
+            results.extend((position, float(coverage[position])) for position in tail.tolist())
+        return results if limit is None else results[:limit]
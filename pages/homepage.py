@@ -1,14 +1,26 @@
 # app.py
 import streamlit as st
+from importlib import import_module
 from components.sidebar import make_sidebar
-from components.utils import init_session_state, init_db, load_data
-from components.recommendor import recommend_display
-from components.emotion_recommendor import get_movie_details
-from components.movie_browser import paging_movies
-from components.movie_details import movie_description
-from components.watchlist import show_watchlist
-from components.preferences import show_preferences
-from components.dashboard import show_dashboard
+from components.utils import init_session_state, init_db, get_engine, show_recent_recommendations
+from components.auth import restore_session
+from components.warmup import start_warmup
+
+# Menu entry -> (module, function); a page's module is imported the first
+# time that page is shown, not on every app start
+PAGES = {
+    'Recommend Similar Movies': ('components.recommendor', 'recommend_display'),
+    'Recommend by Emotions': ('components.emotion_recommendor', 'get_movie_details'),
+    'Because You Watched': ('components.watchlist_recommendor', 'because_you_watched'),
+    'Browse All Movies': ('components.movie_browser', 'paging_movies'),
+    'Movie Details': ('components.movie_details', 'movie_description'),
+    'My Watchlist': ('components.watchlist', 'show_watchlist'),
+    'My Preferences': ('components.preferences', 'show_preferences'),
+    'Dashboard': ('components.dashboard', 'show_dashboard'),
+}
+# Pages that add to the recent recommendations draw that table inside their
+# own fragment, so it updates on the same click as their results
+DRAWS_RECENT = {'Recommend Similar Movies', 'Because You Watched'}
 
 # Set page config
 st.set_page_config(
@@ -20,9 +32,9 @@ st.set_page_config(
 
 def check_authentication():
     """Check if user is properly authenticated"""
-    if ('logged_in' not in st.session_state or 
-        not st.session_state.logged_in or 
-        'user_data' not in st.session_state):
+    # Reruns and page switches only check session state; a reload with a
+    # remember-me cookie is restored from the sessions table, no password hashing
+    if not restore_session():
         
         st.error("🚫 Access Denied: Please login to access Movie-Thruster")
         st.markdown("---")
@@ -41,79 +53,34 @@ def check_authentication():
 def main():
     check_authentication()
     
-    # Initialize session state and database
+    # Initialize session state
     init_session_state()
-    init_db()
+    
+    # No-op after the login page started it; a remember-me reload may land here first
+    start_warmup()
     
     # Load data if not already loaded
     if not st.session_state.movies_loaded:
         with st.spinner("Loading movie data..."):
-            movies, similarity, moviesemo = load_data()
-            st.session_state.movies = movies
-            st.session_state.similarity = similarity
-            st.session_state.moviesemo = moviesemo
+            # Builds the engine (catalog, similarity sources) and the fuzzy title index
+            engine = get_engine()
+            engine.catalog.title_index
             st.session_state.movies_loaded = True
     
+    # Initialize the database
+    init_db()
+    
     # Setup sidebar
     make_sidebar()
     
     # Main content based on selection
-    if st.session_state.user_menu == 'Recommend Similar Movies':
-        recommend_display()
-    elif st.session_state.user_menu == 'Recommend by Emotions':
-        get_movie_details()
-    elif st.session_state.user_menu == 'Browse All Movies':
-        paging_movies()
-    elif st.session_state.user_menu == 'Movie Details':
-        movie_description()
-    elif st.session_state.user_menu == 'My Watchlist':
-        show_watchlist()
-    elif st.session_state.user_menu == 'My Preferences':
-        show_preferences()
-    elif st.session_state.user_menu == 'Dashboard':
-        show_dashboard()
+    if st.session_state.user_menu in PAGES:
+        module, function = PAGES[st.session_state.user_menu]
+        getattr(import_module(module), function)()
     
     # Recent recommendations section (shown on all pages except dashboard)
-    if st.session_state.user_menu != 'Dashboard':
-        st.markdown("---")
-        st.header("📋 Recently Recommended Movies")
-        
-        # Load recent recommendations if not loaded
-        if not st.session_state.recent_recommendations:
-            from components.utils import fetch_recommendations
-            st.session_state.recent_recommendations = fetch_recommendations()
-        
-        if st.session_state.recent_recommendations:
-            # Display as a table
-            import pandas as pd
-            df = pd.DataFrame(st.session_state.recent_recommendations, 
-                             columns=['Movie', 'Genres', 'Rating', 'Date'])
-            st.dataframe(df, use_container_width=True)
-            
-            # Actions
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                if st.button('🔄 Refresh Recommendations'):
-                    from components.utils import fetch_recommendations
-                    st.session_state.recent_recommendations = fetch_recommendations()
-                    st.rerun()
-            
-            with col2:
-                if st.button('🗑️ Clear All Recommendations'):
-                    from components.utils import clear_recommendations
-                    clear_recommendations()
-                    st.session_state.recent_recommendations = []
-                    st.success("All recommendations have been cleared!")
-                    st.rerun()
-            
-            with col3:
-                if st.button('📊 Show Genre Distribution'):
-                    from components.utils import fetch_all_recommendations, display_genre_pie_chart
-                    all_recommendations = fetch_all_recommendations()
-                    display_genre_pie_chart(all_recommendations)
-        else:
-            st.info("No recommendations yet. Get some recommendations first!")
+    if st.session_state.user_menu != 'Dashboard' and st.session_state.user_menu not in DRAWS_RECENT:
+        show_recent_recommendations()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file